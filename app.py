@@ -7,6 +7,7 @@ A powerful desktop application for AI chat, document processing, and note-taking
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox, colorchooser, simpledialog
 import threading
+import multiprocessing
 import os
 import sys
 import json
@@ -17,6 +18,7 @@ import tempfile
 import subprocess
 import sqlite3
 import platform
+import importlib.util
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
@@ -148,6 +150,8 @@ class OANA:
             data_dir = os.path.join(os.path.dirname(__file__), "data")
             os.makedirs(data_dir, exist_ok=True)
             self.db = OANADatabase(os.path.join(data_dir, "oana.db"))
+            # Once per start, off the UI thread: fresh planner stats and a bounded WAL
+            threading.Thread(target=self.db.maintenance, daemon=True).start()
         except Exception as e:
             print(f"Database initialization failed: {e}")
             self.db = None
@@ -990,6 +994,8 @@ class OANA:
         if self.settings.get("auto_save_chat", True) and self.chat_history:
             self.auto_save_chat_history()
         self.save_settings()
+        if self.db:
+            self.db.close()
         self.root.quit()
         self.root.destroy()
         
@@ -1014,7 +1020,11 @@ class OANA:
             try:
                 self.ai_status_var.set("AI: Loading...")
                 self.ai_engine = AIEngine()
-                self.summarizer = Summarizer(self.ai_engine)
+                # Per-user, outside the project tree: the cache holds summaries of
+                # private documents and must never be bundled into a build
+                cache_dir = os.path.join(os.path.expanduser("~"), ".oana")
+                os.makedirs(cache_dir, exist_ok=True)
+                self.summarizer = Summarizer(self.ai_engine, os.path.join(cache_dir, "summary_cache.db"))
                 
                 if self.ai_engine.is_ready():
                     self.ai_status_var.set("AI: Ready")
@@ -1264,7 +1274,7 @@ class OANA:
         self.chat_display.see(tk.END)
         
     def summarize_selected(self):
-        """Summarize selected document"""
+        """Summarize the selected documents"""
         selection = self.doc_tree.selection()
         if not selection:
             messagebox.showwarning("Warning", "Please select a document to summarize")
@@ -1274,26 +1284,25 @@ class OANA:
             messagebox.showwarning("Warning", "AI engine is not ready")
             return
             
-        # Get the selected item and find the corresponding document
-        selected_item = selection[0]
-        doc_name = self.doc_tree.item(selected_item, 'text')
-        
-        # Find document in uploaded_documents list
-        doc_info = None
-        for doc in self.uploaded_documents:
-            if doc['name'] == doc_name:
-                doc_info = doc
-                break
+        # Find the selected documents in uploaded_documents, in selection order
+        docs_by_name = {doc['name']: doc for doc in self.uploaded_documents}
+        selected_docs = [
+            docs_by_name[self.doc_tree.item(item, 'text')]
+            for item in selection
+            if self.doc_tree.item(item, 'text') in docs_by_name
+        ]
                 
-        if not doc_info:
+        if not selected_docs:
             messagebox.showerror("Error", "Document not found")
             return
         
         def summarize():
             try:
                 self.status_var.set("Generating summary...")
-                summary = self.summarizer.summarize(doc_info['content'])
-                self.add_to_chat("AI", f"📄 Summary of '{doc_info['name']}':\n\n{summary}")
+                # Several selected documents share one model call
+                summaries = self.summarizer.summarize_batch([doc['content'] for doc in selected_docs])
+                for doc_info, summary in zip(selected_docs, summaries):
+                    self.add_to_chat("AI", f"📄 Summary of '{doc_info['name']}':\n\n{summary}")
             except Exception as e:
                 self.add_to_chat("System", f"Error generating summary: {str(e)}")
             finally:
@@ -1332,6 +1341,8 @@ class OANA:
         """Clear chat history"""
         if messagebox.askyesno("Confirm", "Clear all chat history?"):
             self.chat_history.clear()
+            if self.ai_engine:
+                self.ai_engine.reset_conversation()
             self.chat_display.configure(state=tk.NORMAL)
             self.chat_display.delete(1.0, tk.END)
             self.chat_display.configure(state=tk.DISABLED)
@@ -1386,6 +1397,8 @@ class OANA:
         if self.settings.get("auto_save_chat", True) and self.chat_history:
             self.auto_save_chat_history()
         self.save_settings()
+        if self.db:
+            self.db.close()
         self.root.quit()
         self.root.destroy()
         
@@ -1808,24 +1821,17 @@ class OANA:
         
         # Check for dependency issues
         status_lines.append(f"\n🔍 Quick Dependency Check:")
-        try:
-            import llama_cpp
-            status_lines.append("• llama-cpp-python: ✅ Available")
-        except ImportError:
-            status_lines.append("• llama-cpp-python: ❌ Not installed")
-        
-        try:
-            import ollama
-            status_lines.append("• ollama: ✅ Available")
-        except ImportError:
-            status_lines.append("• ollama: ❌ Not installed")
-            
-        try:
-            import torch
-            import transformers
-            status_lines.append("• transformers: ✅ Available")
-        except ImportError:
-            status_lines.append("• transformers: ❌ Not installed")
+        # Locate the packages without importing them; torch alone takes seconds to load
+        dependency_modules = [
+            ("llama-cpp-python", ("llama_cpp",)),
+            ("ollama", ("ollama",)),
+            ("transformers", ("torch", "transformers")),
+        ]
+        for label, modules in dependency_modules:
+            if all(importlib.util.find_spec(module) is not None for module in modules):
+                status_lines.append(f"• {label}: ✅ Available")
+            else:
+                status_lines.append(f"• {label}: ❌ Not installed")
         
         # Recommendations
         status_lines.append(f"\n💡 Recommendations:")
@@ -3540,19 +3546,19 @@ class ModelDownloadDialog:
         # Add models from downloader
         for i, model in enumerate(self.downloader.recommended_models):
             # Check if model is already downloaded
-            local_path = self.downloader.models_dir / model['filename']
+            local_path = self.downloader.models_dir / model.filename
             if local_path.exists():
                 status = "✅ Downloaded"
             else:
                 status = "⬇️ Available"
             
             # Add recommended tag
-            name = model['name']
-            if model.get('recommended', False):
+            name = model.name
+            if model.recommended:
                 name += " ⭐"
             
             self.model_tree.insert("", tk.END, text=name, 
-                                 values=(model['size'], model['description'], status))
+                                 values=(model.size, model.description, status))
     
     def download_selected_model(self):
         """Download the selected model"""
@@ -3589,7 +3595,9 @@ class ModelDownloadDialog:
         """Download a single model in a thread"""
         try:
             success = self.downloader.download_model(model_index)
-            self.window.after(0, lambda: self._download_complete(success))
+            model = self.downloader.recommended_models[model_index - 1]
+            model_path = self.downloader.models_dir / model.filename
+            self.window.after(0, lambda: self._download_complete(success, model_path))
         except Exception as e:
             self.window.after(0, lambda: messagebox.showerror("Download Error", f"Failed to download model: {str(e)}"))
     
@@ -3601,9 +3609,11 @@ class ModelDownloadDialog:
         except Exception as e:
             self.window.after(0, lambda: messagebox.showerror("Download Error", f"Failed to download models: {str(e)}"))
     
-    def _download_complete(self, success):
+    def _download_complete(self, success, model_path=None):
         """Handle download completion"""
         if success:
+            if model_path:
+                self._warm_model_cache(model_path)
             messagebox.showinfo("Success", "Model download completed!")
             self.refresh_status()
             # Offer to reload AI engine
@@ -3629,9 +3639,9 @@ class ModelDownloadDialog:
             # Copy file to models directory
             if self.downloader:
                 try:
-                    import shutil
                     dest_path = self.downloader.models_dir / os.path.basename(filename)
-                    shutil.copy2(filename, dest_path)
+                    self._copy_model_file(filename, dest_path)
+                    self._warm_model_cache(dest_path)
                     messagebox.showinfo("Success", f"Model copied to: {dest_path}")
                     self.refresh_status()
                 except Exception as e:
@@ -3639,6 +3649,82 @@ class ModelDownloadDialog:
             else:
                 messagebox.showinfo("Info", f"Local model selected: {os.path.basename(filename)}")
 
+    def _warm_model_cache(self, path):
+        """Pull a model file into the OS page cache in the background so a
+        following reload_model() finds its pages already resident"""
+        def warm():
+            try:
+                fd = os.open(str(path), os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            except OSError:
+                return
+            try:
+                size = os.fstat(fd).st_size
+                if hasattr(os, 'posix_fadvise'):
+                    # Asynchronous kernel readahead, returns immediately
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+                else:
+                    # Sequential read populates the cache on other platforms
+                    while os.read(fd, 8 * 1024 * 1024):
+                        pass
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+                
+        threading.Thread(target=warm, daemon=True).start()
+        
+    def _copy_model_file(self, src, dst):
+        """Copy a model file, reserving its full size on disk up front"""
+        import shutil
+        if not hasattr(os, 'posix_fallocate'):
+            # macOS and Windows: shutil's native copy (fcopyfile / CopyFile)
+            # already avoids userspace buffers and reserves the space itself
+            shutil.copy2(src, dst)
+            return
+            
+        size = os.path.getsize(src)
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            # Pre-allocating gives the filesystem a chance to hand out one
+            # contiguous extent instead of growing the file write by write
+            if size:
+                try:
+                    os.posix_fallocate(fdst.fileno(), 0, size)
+                except OSError:
+                    pass  # Not supported here; copy normally
+                    
+            # Copy inside the kernel, the way shutil.copyfile does on Linux;
+            # whatever it could not copy goes through a userspace buffer
+            copied = self._kernel_copy(fsrc.fileno(), fdst.fileno(), size)
+            if copied < size:
+                fsrc.seek(copied)
+                fdst.seek(copied)
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+            fdst.truncate()
+        shutil.copystat(src, dst)
+        
+    @staticmethod
+    def _kernel_copy(fd_in, fd_out, size):
+        """Copy from the start of fd_in with copy_file_range or sendfile; returns bytes copied"""
+        # Both advance the file offsets, so a fallback continues where they stopped
+        chunk = 1 << 30
+        copied = 0
+        try:
+            if hasattr(os, 'copy_file_range'):
+                while copied < size:
+                    sent = os.copy_file_range(fd_in, fd_out, min(chunk, size - copied))
+                    if not sent:
+                        break
+                    copied += sent
+            elif hasattr(os, 'sendfile'):
+                while copied < size:
+                    sent = os.sendfile(fd_out, fd_in, None, min(chunk, size - copied))
+                    if not sent:
+                        break
+                    copied += sent
+        except OSError:
+            pass  # Cross-device or unsupported filesystem
+        return copied
+
 
 class ModelSettingsDialog:
     """Dialog for model settings"""
@@ -3661,9 +3747,12 @@ class ModelSettingsDialog:
         # Temperature
         ttk.Label(main_frame, text="Temperature:").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.temp_var = tk.DoubleVar(value=0.7)
-        temp_scale = ttk.Scale(main_frame, from_=0.1, to=2.0, variable=self.temp_var, orient=tk.HORIZONTAL)
+        self._temp_after = None
+        temp_scale = ttk.Scale(main_frame, from_=0.1, to=2.0, variable=self.temp_var, orient=tk.HORIZONTAL,
+                               command=self._on_temp_change)
         temp_scale.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=2)
-        ttk.Label(main_frame, textvariable=self.temp_var).grid(row=0, column=2, padx=(10, 0), pady=2)
+        self.temp_label = ttk.Label(main_frame, text="0.70")
+        self.temp_label.grid(row=0, column=2, padx=(10, 0), pady=2)
         
         # Max tokens
         ttk.Label(main_frame, text="Max Tokens:").grid(row=1, column=0, sticky=tk.W, pady=2)
@@ -3681,12 +3770,23 @@ class ModelSettingsDialog:
         
         main_frame.columnconfigure(1, weight=1)
         
+    def _on_temp_change(self, value):
+        """Debounce temperature label updates to ~20 Hz while dragging"""
+        if self._temp_after is not None:
+            self.window.after_cancel(self._temp_after)
+        self._temp_after = self.window.after(50, self._update_temp_label, value)
+        
+    def _update_temp_label(self, value):
+        self._temp_after = None
+        self.temp_label.configure(text=f"{float(value):.2f}")
+        
     def apply_settings(self):
         messagebox.showinfo("Info", "Settings applied successfully")
         
     def reset_settings(self):
         self.temp_var.set(0.7)
         self.tokens_var.set(512)
+        self._update_temp_label(0.7)
 
 
 class TroubleshootingDialog:
@@ -3860,4 +3960,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # PDF extraction uses worker processes; frozen builds need this to start them
+    multiprocessing.freeze_support()
     main()
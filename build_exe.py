@@ -29,19 +29,18 @@ def check_requirements():
 
 def clean_build():
     """Clean previous build artifacts"""
-    dirs_to_clean = ['build', 'dist', 'prod']
-    files_to_clean = ['*.spec', '*.exe']
+    dirs_to_clean = {'build', 'dist', 'prod'}
+    file_suffixes = ('.spec', '.exe')
     
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            print(f"Cleaning {dir_name}/")
-            shutil.rmtree(dir_name)
-    
-    for pattern in files_to_clean:
-        import glob
-        for file in glob.glob(pattern):
-            print(f"Removing {file}")
-            os.remove(file)
+    # Single directory pass instead of an exists() probe / glob per pattern
+    with os.scandir('.') as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.name in dirs_to_clean and entry.is_dir():
+                print(f"Cleaning {entry.name}/")
+                shutil.rmtree(entry.path)
+            elif entry.name.endswith(file_suffixes) and entry.is_file():
+                print(f"Removing {entry.name}")
+                os.remove(entry.path)
 
 def create_spec_file():
     """Create PyInstaller spec file with proper configuration"""
@@ -54,7 +53,6 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('models/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf', 'models/'),
         ('config.json', '.'),
         ('README.md', '.'),
         ('requirements.txt', '.'),
@@ -87,6 +85,13 @@ a = Analysis(
     noarchive=False,
 )
 
+# Attach the already-quantized model as a plain data file after analysis so it
+# is copied verbatim into the bundle rather than scanned with the sources
+a.datas += [
+    ('models/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf',
+     'models/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf', 'DATA'),
+]
+
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
 exe = EXE(
@@ -115,7 +120,7 @@ coll = COLLECT(
     a.datas,
     strip=False,
     upx=True,
-    upx_exclude=[],
+    upx_exclude=['*.gguf'],
     name='OANA',
 )
 '''
@@ -135,11 +140,14 @@ def build_executable():
     cmd = [sys.executable, '-m', 'PyInstaller', '--clean', 'OANA.spec']
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
+        # Stream PyInstaller output as it arrives instead of buffering it all
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, bufsize=1)
+        for line in proc.stdout:
+            sys.stdout.write(line)
+        returncode = proc.wait()
+        if returncode != 0:
             print("Build failed!")
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
             return False
         else:
             print("Build successful!")
@@ -258,11 +266,16 @@ def main():
         print(f"- Portable: prod/OANA-Portable/")
     
     # Find installer files
-    for ext in ['.exe']:
-        for name in ['oana-installer', 'setup', 'installer']:
-            installer = f"{name}{ext}"
-            if os.path.exists(installer):
-                print(f"- Installer: {installer}")
+    installer_prefixes = ('oana-installer', 'setup', 'installer')
+    with os.scandir('.') as entries:
+        installers = sorted(
+            e.name for e in entries
+            if e.is_file()
+            and e.name.lower().endswith('.exe')
+            and e.name.lower().startswith(installer_prefixes)
+        )
+    for installer in installers:
+        print(f"- Installer: {installer}")
     
     print("\nTo distribute:")
     print("1. Use prod/OANA-Portable/ for portable version")
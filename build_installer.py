@@ -9,137 +9,43 @@ import sys
 import shutil
 import subprocess
 import platform
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 
-class OANABuilder:
-    def __init__(self):
-        self.project_dir = Path(__file__).parent
-        self.dist_dir = self.project_dir / "dist"
-        self.build_dir = self.project_dir / "build"
-        
-    def check_dependencies(self):
-        """Check if required build tools are installed"""
-        print("🔍 Checking build dependencies...")
-        
-        try:
-            import PyInstaller
-            print("✅ PyInstaller found")
-        except ImportError:
-            print("❌ PyInstaller not found. Installing...")
-            subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
-            
-        try:
-            import requests
-            print("✅ Requests found")
-        except ImportError:
-            subprocess.run([sys.executable, "-m", "pip", "install", "requests"], check=True)
-            
-    def install_requirements(self):
-        """Install all project requirements"""
-        print("📦 Installing project requirements...")
-        requirements_file = self.project_dir / "requirements.txt"
-        if requirements_file.exists():
-            subprocess.run([
-                sys.executable, "-m", "pip", "install", "-r", str(requirements_file)
-            ], check=True)
-        else:
-            print("⚠️ requirements.txt not found")
-            
-    def create_spec_file(self):
-        """Create PyInstaller spec file"""
-        print("📝 Creating PyInstaller spec file...")
-        
-        spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
-
-block_cipher = None
-
-a = Analysis(
-    ['app.py'],
-    pathex=['{self.project_dir}'],
-    binaries=[],
-    datas=[
-        ('utils', 'utils'),
-        ('data', 'data'),
-        ('logs', 'logs'),
-        ('*.json', '.'),
-        ('README.md', '.'),
-        ('LICENSE*', '.'),
-    ],
-    hiddenimports=[
-        'tkinter',
-        'tkinter.ttk',
-        'tkinter.scrolledtext',
-        'tkinter.filedialog',
-        'tkinter.messagebox',
-        'tkinter.colorchooser',
-        'tkinter.simpledialog',
-        'sqlite3',
-        'llama_cpp',
-        'fitz',
-        'docx',
-        'docx2txt',
-        'PIL',
-        'requests',
-        'weasyprint',
-    ],
-    hookspath=[],
-    runtime_hooks=[],
-    excludes=[
-        'matplotlib',
-        'numpy',
-        'pandas',
-        'scipy',
-        'jupyter',
-        'IPython',
-        'pytest',
-    ],
-    win_no_prefer_redirects=False,
-    win_private_assemblies=False,
-    cipher=block_cipher,
-    noarchive=False,
-)
+# Modules the app always needs, whether or not analysis can see them
+BASE_HIDDENIMPORTS = [
+    'tkinter',
+    'tkinter.ttk',
+    'tkinter.scrolledtext',
+    'tkinter.filedialog',
+    'tkinter.messagebox',
+    'tkinter.colorchooser',
+    'tkinter.simpledialog',
+    'sqlite3',
+    'llama_cpp',
+    'fitz',
+    'docx',
+    'docx2txt',
+    'PIL',
+    'requests',
+    'weasyprint',
+]
 
-pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    [],
-    exclude_binaries=True,
-    name='OANA',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    console=False,  # Set to False for windowed app
-    icon='icon.ico' if os.path.exists('icon.ico') else None,
-    version='version_info.txt' if os.path.exists('version_info.txt') else None,
-)
+# Optional heavyweight backends; only bundled if analysis pulls them in itself
+OPTIONAL_IMPORTS = {'torch', 'transformers'}
 
-coll = COLLECT(
-    exe,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    name='OANA',
-)
-'''
-        
-        spec_file = self.project_dir / "oana.spec"
-        with open(spec_file, 'w', encoding='utf-8') as f:
-            f.write(spec_content)
-            
-        return spec_file
-        
-    def create_version_info(self):
-        """Create version information file for Windows exe"""
-        print("📋 Creating version info...")
-        
-        version_info = '''# UTF-8
+# Runtime DLLs that UPX commonly gets flagged by antivirus for compressing
+UPX_EXCLUDE = ['vcruntime140.dll', 'VCRUNTIME140_1.dll', 'python3*.dll']
+
+# Static data formats under data/ that ship in the bundle. Everything else there
+# is runtime state (the SQLite database and its -wal/-shm files, caches, chat
+# history) and may hold the builder's private documents, so it never ships
+SHIPPED_DATA_PATTERNS = ('*.json', '*.txt', '*.csv', '*.md')
+
+# Other build file templates
+VERSION_INFO_TEMPLATE = '''# UTF-8
 #
 # For more details about fixed file info 'ffi' see:
 # http://msdn.microsoft.com/en-us/library/ms646997.aspx
@@ -172,42 +78,8 @@ VSVersionInfo(
   ]
 )
 '''
-        
-        version_file = self.project_dir / "version_info.txt"
-        with open(version_file, 'w', encoding='utf-8') as f:
-            f.write(version_info)
-            
-    def build_executable(self):
-        """Build the executable using PyInstaller"""
-        print("🏗️ Building executable...")
-        
-        # Clean previous builds
-        if self.dist_dir.exists():
-            shutil.rmtree(self.dist_dir)
-        if self.build_dir.exists():
-            shutil.rmtree(self.build_dir)
-            
-        spec_file = self.create_spec_file()
-        self.create_version_info()
-        
-        # Run PyInstaller
-        cmd = [
-            sys.executable, "-m", "PyInstaller",
-            "--clean",
-            str(spec_file)
-        ]
-        
-        result = subprocess.run(cmd, cwd=self.project_dir)
-        if result.returncode != 0:
-            raise Exception("PyInstaller build failed")
-            
-        print("✅ Executable built successfully!")
-        
-    def create_installer_script(self):
-        """Create NSIS installer script for Windows"""
-        print("📦 Creating installer script...")
-        
-        nsis_script = '''!define APPNAME "OANA"
+
+NSIS_TEMPLATE = '''!define APPNAME "OANA"
 !define COMPANYNAME "OANA Project"
 !define DESCRIPTION "Offline AI and Note Assistant"
 !define VERSIONMAJOR 1
@@ -282,10 +154,362 @@ Section "Uninstall"
     DeleteRegKey HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${COMPANYNAME} ${APPNAME}"
 SectionEnd
 '''
+
+SETUP_BAT_TEMPLATE = '''@echo off
+echo ===============================================
+echo OANA - Development Environment Setup
+echo ===============================================
+echo.
+
+echo Checking Python installation...
+python --version
+if errorlevel 1 (
+    echo ERROR: Python not found! Please install Python 3.8+ first.
+    echo Download from: https://python.org/downloads/
+    pause
+    exit /b 1
+)
+
+echo.
+echo Installing/upgrading pip...
+python -m pip install --upgrade pip wheel
+
+echo.
+echo Installing prebuilt binary packages...
+python -m pip install --prefer-binary --only-binary=llama-cpp-python,PyMuPDF --extra-index-url https://abetlen.github.io/llama-cpp-python/whl/cpu llama-cpp-python PyMuPDF
+if errorlevel 1 (
+    echo ERROR: No prebuilt wheel of llama-cpp-python or PyMuPDF matches this Python.
+    echo Use a Python version with published wheels, or install the
+    echo Visual Studio Build Tools and run: python -m pip install llama-cpp-python
+    pause
+    exit /b 1
+)
+
+echo.
+echo Installing project dependencies...
+if exist requirements.txt (
+    python -m pip install --prefer-binary -r requirements.txt
+) else (
+    echo WARNING: requirements.txt not found
+    echo Installing basic dependencies...
+    python -m pip install --prefer-binary python-docx docx2txt requests
+)
+
+echo.
+echo Creating necessary directories...
+if not exist "models" mkdir models
+if not exist "data" mkdir data
+if not exist "data\\chat_history" mkdir data\\chat_history
+if not exist "logs" mkdir logs
+
+echo.
+echo Setting up database...
+python -c "from utils.database import OANADatabase; db = OANADatabase(); print('Database initialized')"
+
+echo.
+echo ===============================================
+echo Setup complete! You can now run OANA with:
+echo   python app.py
+echo.
+echo For first-time use:
+echo 1. Download AI models via the app menu
+echo 2. Configure settings as needed
+echo ===============================================
+pause
+'''
+
+
+class OANABuilder:
+    # PyInstaller spec template; str.format placeholders are filled per build
+    SPEC_TEMPLATE = (Path(__file__).parent / "oana.spec.in").read_text(encoding='utf-8')
+    
+    def __init__(self, hardlink=False, use_upx=False):
+        self.project_dir = Path(__file__).parent
+        self.dist_dir = self.project_dir / "dist"
+        self.build_dir = self.project_dir / "build"
+        self.hardlink = hardlink
+        self.use_upx = use_upx
+        
+    def check_dependencies(self):
+        """Check if required build tools are installed"""
+        print("🔍 Checking build dependencies...")
+        
+        # Share the dependency checker's on-disk probe cache
+        from check_dependencies import DependencyChecker
+        has_pyinstaller, has_requests = DependencyChecker().probe_packages(["PyInstaller", "requests"])
+        
+        to_install = []
+        if has_pyinstaller:
+            print("✅ PyInstaller found")
+        else:
+            print("❌ PyInstaller not found. Installing...")
+            to_install.append("pyinstaller")
+            
+        if has_requests:
+            print("✅ Requests found")
+        else:
+            to_install.append("requests")
+            
+        if to_install:
+            subprocess.run([
+                sys.executable, "-m", "pip", "install",
+                "--disable-pip-version-check", "--no-input", *to_install
+            ], check=True)
+            
+    def install_requirements(self):
+        """Install all project requirements"""
+        print("📦 Installing project requirements...")
+        requirements_file = self.project_dir / "requirements.txt"
+        if requirements_file.exists():
+            pip_cmd = [sys.executable, "-m", "pip", "install",
+                       "--disable-pip-version-check", "--no-input", "--prefer-binary"]
+            missing = self._unsatisfied_requirements(requirements_file)
+            if missing is None:
+                subprocess.run(pip_cmd + ["-r", str(requirements_file)], check=True)
+            elif missing:
+                print(f"   Missing or outdated: {', '.join(missing)}")
+                subprocess.run(pip_cmd + missing, check=True)
+            else:
+                print("✅ All requirements already satisfied")
+        else:
+            print("⚠️ requirements.txt not found")
+            
+    def _unsatisfied_requirements(self, requirements_file):
+        """Return the requirement lines not met by installed distributions
+        
+        Returns None when that can't be decided locally (no `packaging`,
+        pip options in the file, ...) and pip should resolve the whole file.
+        """
+        try:
+            from importlib import metadata
+            from packaging.requirements import InvalidRequirement, Requirement
+            from packaging.utils import canonicalize_name
+        except ImportError:
+            return None
+            
+        # One pass over site-packages' *.dist-info
+        installed = {}
+        for dist in metadata.distributions():
+            name = dist.metadata['Name']
+            if name:
+                installed[canonicalize_name(name)] = dist.version
+                
+        missing = []
+        for line in requirements_file.read_text(encoding='utf-8').splitlines():
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('-'):
+                return None
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                return None
+            if req.marker and not req.marker.evaluate():
+                continue
+            version = installed.get(canonicalize_name(req.name))
+            if version is None or not req.specifier.contains(version, prereleases=True):
+                missing.append(line)
+        return missing
+        
+    def create_spec_file(self):
+        """Create PyInstaller spec file"""
+        print("📝 Creating PyInstaller spec file...")
+        
+        spec_file = self.project_dir / "oana.spec"
+        rendered = self._render_spec().encode('utf-8')
+        
+        # Leave an identical spec untouched so its mtime stays stable
+        try:
+            unchanged = spec_file.read_bytes() == rendered
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            spec_file.write_bytes(rendered)
+            
+        return spec_file
+        
+    def _render_spec(self):
+        """Render the PyInstaller spec for the current project and options"""
+        datas = self._collect_datas()
+        hiddenimports = self._get_hiddenimports()
+        
+        return self.SPEC_TEMPLATE.format(
+            project_dir=self.project_dir,
+            datas="\n".join(f"        {item!r}," for item in datas),
+            hiddenimports="\n".join(f"        {name!r}," for name in hiddenimports),
+            upx=self.use_upx,
+            upx_exclude=UPX_EXCLUDE if self.use_upx else [],
+        )
+        
+    def _get_hiddenimports(self):
+        """Base hidden imports plus whatever utils/ needs, minus optional backends"""
+        return BASE_HIDDENIMPORTS + [
+            name for name in sorted(self._collect_utils_imports())
+            if name not in BASE_HIDDENIMPORTS and name.split('.')[0] not in OPTIONAL_IMPORTS
+        ]
+        
+    def _collect_utils_imports(self):
+        """Collect third-party modules imported anywhere in utils/*.py
+        
+        The app adds utils/ to sys.path at runtime, so PyInstaller's analysis
+        never sees these imports on its own.
+        """
+        import ast
+        
+        utils_dir = self.project_dir / "utils"
+        sources = list(utils_dir.glob("*.py"))
+        local_modules = {source.stem for source in sources}
+        stdlib_modules = getattr(sys, "stdlib_module_names", frozenset())
+        
+        found = set()
+        for source in sources:
+            tree = ast.parse(source.read_text(encoding='utf-8'), filename=str(source))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    names = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    names = [node.module]
+                else:
+                    continue
+                for name in names:
+                    top_level = name.split('.')[0]
+                    if top_level not in stdlib_modules and top_level not in local_modules:
+                        found.add(name)
+        return found
+        
+    def _collect_datas(self):
+        """List the data files to bundle; only allowlisted static data from data/"""
+        datas = [('utils', 'utils')]
+        
+        data_dir = self.project_dir / "data"
+        if data_dir.is_dir():
+            shipped = {entry for pattern in SHIPPED_DATA_PATTERNS for entry in data_dir.glob(pattern)}
+            for entry in sorted(shipped):
+                if entry.is_file():
+                    datas.append((f"data/{entry.name}", 'data'))
+        
+        datas += [
+            ('*.json', '.'),
+            ('README.md', '.'),
+            ('LICENSE*', '.'),
+        ]
+        return datas
+        
+    def create_version_info(self):
+        """Create version information file for Windows exe"""
+        print("📋 Creating version info...")
+        
+        version_file = self.project_dir / "version_info.txt"
+        version_file.write_text(VERSION_INFO_TEMPLATE, encoding='utf-8')
+            
+    def _compute_build_hash(self):
+        """Fingerprint everything that feeds the executable build
+        
+        Source files contribute (path, mtime, size) rather than their bytes,
+        which is enough to notice edits without reading the whole tree.
+        """
+        import hashlib
+        
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self._render_spec().encode('utf-8'))
+        h.update(VERSION_INFO_TEMPLATE.encode('utf-8'))
+        
+        inputs = [self.project_dir / "app.py", self.project_dir / "requirements.txt",
+                  self.project_dir / "README.md"]
+        inputs += sorted(self.project_dir.glob("*.json"))
+        inputs += sorted((self.project_dir / "utils").glob("*.py"))
+        inputs += [self.project_dir / source for source, _ in self._collect_datas()
+                   if source.startswith("data/")]
+        for path in inputs:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            h.update(f"{path.relative_to(self.project_dir)}|{st.st_mtime_ns}|{st.st_size}\n".encode('utf-8'))
+        return h.hexdigest()
+        
+    def precompile_bytecode(self):
+        """Warm __pycache__ on all cores so PyInstaller can load cached bytecode
+        instead of compiling every module serially"""
+        import compileall
+        import importlib.util
+        
+        print("⚡ Precompiling bytecode...")
+        compileall.compile_dir(str(self.project_dir / "utils"), quiet=2, workers=0)
+        
+        for name in sorted({name.split('.')[0] for name in self._get_hiddenimports()}):
+            try:
+                spec = importlib.util.find_spec(name)
+            except (ImportError, ValueError):
+                continue
+            if spec is None:
+                continue
+            
+            # Unwritable site-packages are skipped silently (quiet=2)
+            if spec.submodule_search_locations:
+                for location in spec.submodule_search_locations:
+                    compileall.compile_dir(location, quiet=2, workers=0)
+            elif spec.origin and spec.origin.endswith('.py'):
+                compileall.compile_file(spec.origin, quiet=2)
+                
+    def build_executable(self):
+        """Build the executable using PyInstaller"""
+        print("🏗️ Building executable...")
+        
+        build_hash = self._compute_build_hash()
+        hash_file = self.build_dir / ".oana_build_hash"
+        if (self.dist_dir / "OANA").exists() and hash_file.exists():
+            if hash_file.read_text(encoding='utf-8') == build_hash:
+                print("✅ Reusing cached build (inputs unchanged)")
+                return
+        
+        # Clean previous builds
+        if self.dist_dir.exists():
+            self._remove_dist_link()
+            shutil.rmtree(self.dist_dir)
+        if self.build_dir.exists():
+            shutil.rmtree(self.build_dir)
+            
+        spec_file = self.create_spec_file()
+        self.create_version_info()
+        self.precompile_bytecode()
+        
+        # Run PyInstaller in this interpreter rather than paying for a second
+        # cold start; imported lazily so check_dependencies can install it first
+        from PyInstaller import __main__ as pyi_main
+        
+        # Keep PyInstaller's intermediate files in the temp dir (often RAM
+        # backed, and outside the project tree that AV scanners watch)
+        workdir = Path(tempfile.mkdtemp(prefix="oana-pyi-"))
+        
+        previous_cwd = os.getcwd()
+        os.chdir(self.project_dir)
+        try:
+            pyi_main.run([
+                "--clean",
+                "--workpath", str(workdir),
+                "--distpath", str(self.dist_dir),
+                str(spec_file)
+            ])
+        except SystemExit as e:
+            if e.code:
+                raise Exception("PyInstaller build failed")
+        finally:
+            os.chdir(previous_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+            
+        self.build_dir.mkdir(exist_ok=True)
+        hash_file.write_text(build_hash, encoding='utf-8')
+            
+        print("✅ Executable built successfully!")
+        
+    def create_installer_script(self):
+        """Create NSIS installer script for Windows"""
+        print("📦 Creating installer script...")
         
         nsis_file = self.project_dir / "installer.nsi"
-        with open(nsis_file, 'w', encoding='utf-8') as f:
-            f.write(nsis_script)
+        nsis_file.write_text(NSIS_TEMPLATE, encoding='utf-8')
             
         return nsis_file
         
@@ -294,14 +518,20 @@ SectionEnd
         print("📁 Creating portable package...")
         
         portable_dir = self.project_dir / "OANA-Portable"
-        if portable_dir.exists():
-            shutil.rmtree(portable_dir)
-            
-        # Copy dist folder contents
         dist_app_dir = self.dist_dir / "OANA"
-        if dist_app_dir.exists():
-            shutil.copytree(dist_app_dir, portable_dir)
+        
+        # A reused build already has dist/OANA pointing at the portable dir
+        if dist_app_dir.exists() and dist_app_dir.resolve() != portable_dir.resolve():
+            if portable_dir.exists():
+                shutil.rmtree(portable_dir)
+                
+            # Move the build rather than duplicating it, leaving a link behind
+            # so the installer step still finds it under dist/
+            shutil.move(str(dist_app_dir), str(portable_dir))
+            if not self._link_dir(portable_dir, dist_app_dir):
+                self._copy_tree(portable_dir, dist_app_dir)
             
+        if portable_dir.exists():
             # Create run script
             run_script = portable_dir / "run_oana.bat"
             with open(run_script, 'w') as f:
@@ -349,65 +579,58 @@ For more help, visit: https://github.com/ivocreates/OANA-Offline-Ai-and-Note-Ass
                 
             print(f"✅ Portable package created at: {portable_dir}")
             
+    def _link_dir(self, target, link):
+        """Create a directory symlink, or a junction on Windows without symlink rights"""
+        try:
+            os.symlink(target, link, target_is_directory=True)
+            return True
+        except OSError:
+            pass
+        
+        if platform.system() == "Windows":
+            result = subprocess.run(["cmd", "/c", "mklink", "/J", str(link), str(target)],
+                                    capture_output=True)
+            return result.returncode == 0
+        return False
+        
+    def _remove_dist_link(self):
+        """Drop the dist/OANA link without touching the portable dir behind it"""
+        dist_app_dir = self.dist_dir / "OANA"
+        if os.path.realpath(dist_app_dir) != os.path.join(os.path.realpath(self.dist_dir), "OANA"):
+            try:
+                os.unlink(dist_app_dir)
+            except OSError:
+                os.rmdir(dist_app_dir)  # Directory junction
+                
+    def _copy_file(self, src, dst):
+        """Copy (or hard-link, when enabled) a single file"""
+        if self.hardlink:
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass  # Cross-device or unsupported; fall back to a copy
+        shutil.copy2(src, dst)
+        
+    def _copy_tree(self, src, dst):
+        """Copy a directory tree, copying its files on a thread pool"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = []
+            
+            def submit_copy(file_src, file_dst):
+                futures.append(pool.submit(self._copy_file, file_src, file_dst))
+                return file_dst
+                
+            shutil.copytree(src, dst, copy_function=submit_copy)
+            for future in futures:
+                future.result()
+                
     def create_batch_installer(self):
         """Create a simple batch file installer for development setup"""
         print("⚙️ Creating development setup script...")
         
-        setup_script = '''@echo off
-echo ===============================================
-echo OANA - Development Environment Setup
-echo ===============================================
-echo.
-
-echo Checking Python installation...
-python --version
-if errorlevel 1 (
-    echo ERROR: Python not found! Please install Python 3.8+ first.
-    echo Download from: https://python.org/downloads/
-    pause
-    exit /b 1
-)
-
-echo.
-echo Installing/upgrading pip...
-python -m pip install --upgrade pip
-
-echo.
-echo Installing project dependencies...
-if exist requirements.txt (
-    python -m pip install -r requirements.txt
-) else (
-    echo WARNING: requirements.txt not found
-    echo Installing basic dependencies...
-    python -m pip install llama-cpp-python PyMuPDF python-docx docx2txt requests
-)
-
-echo.
-echo Creating necessary directories...
-if not exist "models" mkdir models
-if not exist "data" mkdir data
-if not exist "data\\chat_history" mkdir data\\chat_history
-if not exist "logs" mkdir logs
-
-echo.
-echo Setting up database...
-python -c "from utils.database import OANADatabase; db = OANADatabase(); print('Database initialized')"
-
-echo.
-echo ===============================================
-echo Setup complete! You can now run OANA with:
-echo   python app.py
-echo.
-echo For first-time use:
-echo 1. Download AI models via the app menu
-echo 2. Configure settings as needed
-echo ===============================================
-pause
-'''
-        
         setup_file = self.project_dir / "setup_dev.bat"
-        with open(setup_file, 'w') as f:
-            f.write(setup_script)
+        setup_file.write_text(SETUP_BAT_TEMPLATE)
             
         print(f"✅ Development setup script created: {setup_file}")
         
@@ -456,5 +679,16 @@ pause
             sys.exit(1)
 
 if __name__ == "__main__":
-    builder = OANABuilder()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build the OANA desktop application")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="Hard-link the portable package to dist/ instead of copying it")
+    parser.add_argument("--upx", dest="upx", action="store_true",
+                        help="Compress binaries with UPX (slower build and startup, smaller output)")
+    parser.add_argument("--no-upx", dest="upx", action="store_false",
+                        help="Do not compress binaries with UPX (default)")
+    args = parser.parse_args()
+    
+    builder = OANABuilder(hardlink=args.hardlink, use_upx=args.upx)
     builder.build()
\ No newline at end of file
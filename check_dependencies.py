@@ -4,13 +4,27 @@ Dependency checker for OANA
 Checks for required dependencies and AI backends
 """
 
+import os
 import sys
+import json
 import importlib
+import site
 import subprocess
+import sysconfig
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 class DependencyChecker:
-    def __init__(self):
+    CACHE_FILE = Path.home() / ".oana" / "depcache.json"
+    
+    def __init__(self, use_cache=True, quiet=False, output=None):
+        self.use_cache = use_cache
+        self.quiet = quiet
+        self.output = output  # Defaults to whatever sys.stdout is at flush time
+        self._log_lines = None
+        self._cache_stamp = self._get_cache_stamp()
+        self._probe_cache = self._load_probe_cache() if use_cache else {}
+        
         self.required_packages = [
             ("PyMuPDF", "fitz", "PDF processing"),
             ("python-docx", "docx", "Word document processing"),
@@ -26,72 +40,194 @@ class DependencyChecker:
             ("transformers", "transformers", "Hugging Face models", False),
         ]
         
+    def _log(self, message="", level="info"):
+        """Record a line of output; --quiet keeps only warnings and errors"""
+        if self.quiet and level == "info":
+            return
+        if self._log_lines is None:
+            self._write(message + "\n")
+        else:
+            self._log_lines.append(message)
+    
+    def _write(self, text):
+        (self.output or sys.stdout).write(text)
+    
+    def _flush_log(self):
+        """Write buffered output in one go"""
+        if self._log_lines:
+            self._write("\n".join(self._log_lines) + "\n")
+            self._log_lines = []
+    
     def check_python_version(self):
         """Check Python version"""
-        print("🐍 Checking Python version...")
+        self._log("🐍 Checking Python version...")
         version = sys.version_info
         
         if version.major < 3 or (version.major == 3 and version.minor < 9):
-            print(f"❌ Python 3.9+ required. Current: {version.major}.{version.minor}")
+            self._log(f"❌ Python 3.9+ required. Current: {version.major}.{version.minor}", level="error")
             return False
         else:
-            print(f"✅ Python {version.major}.{version.minor}.{version.micro}")
+            self._log(f"✅ Python {version.major}.{version.minor}.{version.micro}")
             return True
     
-    def check_package(self, package_name, import_name, description=""):
-        """Check if a package is installed"""
+    def _get_cache_stamp(self):
+        """Identify the current interpreter and state of every import location"""
+        stamp = [sys.executable]
+        paths = sysconfig.get_paths()
+        
+        # site-packages plus everything else on sys.path: user site, PYTHONPATH
+        # and .pth entries. Adding a module to any of them changes its mtime
+        directories = [paths.get("purelib"), paths.get("platlib"), site.getusersitepackages()]
+        directories.extend(entry for entry in sys.path if entry)
+        for directory in dict.fromkeys(directories):
+            try:
+                mtime = str(os.stat(directory).st_mtime_ns)
+            except (TypeError, OSError):
+                mtime = ""
+            stamp.append(f"{directory}={mtime}")
+        return "|".join(stamp)
+    
+    def _load_probe_cache(self):
+        """Load cached probe results, discarding them if packages changed"""
+        try:
+            with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("stamp") == self._cache_stamp:
+                return data.get("results", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save_probe_cache(self):
+        """Atomically write probe results back to disk"""
+        if not self.use_cache:
+            return
+        
+        try:
+            self.CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.CACHE_FILE.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"stamp": self._cache_stamp, "results": self._probe_cache}, f)
+            os.replace(tmp_file, self.CACHE_FILE)
+        except OSError:
+            pass  # Caching is best-effort
+    
+    def probe_package(self, import_name, in_process=False):
+        """Return True if a module can be imported
+        
+        Heavy modules are probed in a separate interpreter so that e.g. the
+        CUDA runtime behind torch never gets loaded into this process.
+        """
+        if import_name in self._probe_cache:
+            return self._probe_cache[import_name]
+        
+        if in_process or getattr(sys, 'frozen', False):
+            # Frozen builds have no interpreter to shell out to
+            available = self._probe_in_process(import_name)
+        else:
+            available = self._probe_in_subprocess(import_name)
+        if self.use_cache:
+            self._probe_cache[import_name] = available
+        return available
+    
+    def _probe_in_process(self, import_name):
         try:
             importlib.import_module(import_name)
-            print(f"✅ {package_name} - {description}")
             return True
         except ImportError:
-            print(f"❌ {package_name} - {description} (Not installed)")
+            return False
+    
+    def _probe_in_subprocess(self, import_name):
+        # Plain interpreter flags on purpose: -I/-S would hide user and
+        # PYTHONPATH site directories that the app itself can import from
+        try:
+            result = subprocess.run(
+                [sys.executable, "-c", f"import {import_name}"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=20
+            )
+            return result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+    
+    def probe_packages(self, import_names, in_process=False):
+        """Probe several imports, returning results in input order"""
+        if not import_names:
+            return []
+        
+        if in_process:
+            # Imports serialize on the import lock, so threads would not help
+            results = [self.probe_package(name, in_process=True) for name in import_names]
+        else:
+            # Each probe waits on its own interpreter, so threads are enough here
+            workers = min(len(import_names), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self.probe_package, import_names))
+        
+        self._save_probe_cache()
+        return results
+    
+    def check_package(self, package_name, import_name, description="", available=None):
+        """Check if a package is installed"""
+        if available is None:
+            available = self.probe_package(import_name)
+            self._save_probe_cache()
+        
+        if available:
+            self._log(f"✅ {package_name} - {description}")
+            return True
+        else:
+            self._log(f"❌ {package_name} - {description} (Not installed)", level="error")
             return False
     
     def check_required_packages(self):
         """Check all required packages"""
-        print("\n📦 Checking required packages...")
+        self._log("\n📦 Checking required packages...")
         all_present = True
         missing_packages = []
         
-        for package_name, import_name, description in self.required_packages:
-            if not self.check_package(package_name, import_name, description):
+        # These are cheap to import, so probe them right here
+        results = self.probe_packages([pkg[1] for pkg in self.required_packages], in_process=True)
+        
+        for (package_name, import_name, description), available in zip(self.required_packages, results):
+            if not self.check_package(package_name, import_name, description, available):
                 all_present = False
                 missing_packages.append(package_name)
         
         if missing_packages:
-            print(f"\n❌ Missing required packages: {', '.join(missing_packages)}")
-            print("Install with: pip install " + " ".join(missing_packages))
+            self._log(f"\n❌ Missing required packages: {', '.join(missing_packages)}", level="error")
+            self._log("Install with: pip install " + " ".join(missing_packages), level="error")
         
         return all_present, missing_packages
     
     def check_ai_backends(self):
         """Check AI backend availability"""
-        print("\n🤖 Checking AI backends...")
+        self._log("\n🤖 Checking AI backends...")
         available_backends = []
         recommended_missing = []
         
-        for package_name, import_name, description, recommended in self.ai_backends:
-            if self.check_package(package_name, import_name, description):
+        results = self.probe_packages([backend[1] for backend in self.ai_backends])
+        
+        for (package_name, import_name, description, recommended), available in zip(self.ai_backends, results):
+            if self.check_package(package_name, import_name, description, available):
                 available_backends.append(package_name)
             elif recommended:
                 recommended_missing.append(package_name)
         
         if not available_backends:
-            print("\n⚠️  No AI backends available!")
-            print("Install at least one AI backend:")
-            print("  Recommended: pip install llama-cpp-python")
-            print("  Alternative: pip install torch transformers")
-            print("  Alternative: Install Ollama separately")
+            self._log("\n⚠️  No AI backends available!", level="warning")
+            self._log("Install at least one AI backend:", level="warning")
+            self._log("  Recommended: pip install llama-cpp-python", level="warning")
+            self._log("  Alternative: pip install torch transformers", level="warning")
+            self._log("  Alternative: Install Ollama separately", level="warning")
         elif recommended_missing:
-            print(f"\n⚠️  Recommended backend missing: {', '.join(recommended_missing)}")
-            print("For best performance, install: pip install " + " ".join(recommended_missing))
+            self._log(f"\n⚠️  Recommended backend missing: {', '.join(recommended_missing)}", level="warning")
+            self._log("For best performance, install: pip install " + " ".join(recommended_missing), level="warning")
         
         return available_backends, recommended_missing
     
     def check_models(self):
         """Check for downloaded models"""
-        print("\n📁 Checking for AI models...")
+        self._log("\n📁 Checking for AI models...")
         
         possible_model_dirs = [
             Path(__file__).parent / "models",
@@ -101,48 +237,85 @@ class DependencyChecker:
         
         model_found = False
         for models_dir in possible_model_dirs:
-            if models_dir.exists():
-                gguf_files = list(models_dir.glob("*.gguf"))
-                if gguf_files:
-                    model_found = True
-                    print(f"✅ Found {len(gguf_files)} GGUF model(s) in {models_dir}")
-                    for model_file in gguf_files:
-                        size_mb = model_file.stat().st_size / (1024 * 1024)
-                        print(f"   • {model_file.name} ({size_mb:.1f} MB)")
-                    break
+            if not os.path.isdir(models_dir):
+                continue
+            
+            # One directory pass; scandir already carries the size on Windows
+            with os.scandir(models_dir) as it:
+                gguf_files = [(e.name, e.stat().st_size) for e in it
+                              if e.name.endswith('.gguf') and e.is_file()]
+            if gguf_files:
+                model_found = True
+                self._log(f"✅ Found {len(gguf_files)} GGUF model(s) in {models_dir}")
+                headers_ok = self._probe_gguf_headers(
+                    [os.path.join(models_dir, name) for name, _ in gguf_files])
+                for (name, size), header_ok in zip(gguf_files, headers_ok):
+                    size_mb = size / (1024 * 1024)
+                    note = "" if header_ok else " ⚠️ invalid GGUF header"
+                    self._log(f"   • {name} ({size_mb:.1f} MB){note}",
+                              level="info" if header_ok else "warning")
+                break
         
         if not model_found:
-            print("❌ No GGUF models found")
-            print("Download models with: python download_models.py")
-            print("Or place .gguf files in the 'models/' directory")
+            self._log("❌ No GGUF models found", level="error")
+            self._log("Download models with: python download_models.py", level="error")
+            self._log("Or place .gguf files in the 'models/' directory", level="error")
         
         return model_found
     
+    def _probe_gguf_headers(self, paths):
+        """Check that each file starts with the GGUF magic bytes"""
+        results = []
+        for path in paths:
+            try:
+                with open(path, 'rb', buffering=0) as f:
+                    results.append(f.read(4) == b"GGUF")
+            except OSError:
+                results.append(False)
+        return results
+    
     def install_missing_packages(self, missing_packages):
         """Install missing packages"""
         if not missing_packages:
             return True
         
-        print(f"\n📥 Installing missing packages: {', '.join(missing_packages)}")
+        self._log(f"\n📥 Installing missing packages: {', '.join(missing_packages)}")
+        # pip writes straight to the console, so emit what we have first
+        self._flush_log()
+        (self.output or sys.stdout).flush()
         
         try:
             subprocess.run([
-                sys.executable, "-m", "pip", "install"
+                sys.executable, "-m", "pip", "install",
+                "--disable-pip-version-check", "--no-input"
             ] + missing_packages, check=True)
             
-            print("✅ Packages installed successfully!")
+            # site-packages changed; earlier probe results no longer apply
+            self._probe_cache.clear()
+            self._cache_stamp = self._get_cache_stamp()
+            
+            self._log("✅ Packages installed successfully!")
             return True
             
         except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to install packages: {e}")
-            print("Try installing manually:")
-            print(f"pip install {' '.join(missing_packages)}")
+            self._log(f"❌ Failed to install packages: {e}", level="error")
+            self._log("Try installing manually:", level="error")
+            self._log(f"pip install {' '.join(missing_packages)}", level="error")
             return False
     
     def run_full_check(self, fix=False):
         """Run full dependency check"""
-        print("🔍 OANA Dependency Check")
-        print("=" * 40)
+        # Buffer the report and write it once at the end
+        self._log_lines = []
+        try:
+            return self._run_full_check(fix)
+        finally:
+            self._flush_log()
+            self._log_lines = None
+    
+    def _run_full_check(self, fix):
+        self._log("🔍 OANA Dependency Check")
+        self._log("=" * 40)
         
         all_good = True
         
@@ -154,38 +327,42 @@ class DependencyChecker:
         packages_ok, missing_packages = self.check_required_packages()
         if not packages_ok:
             all_good = False
-            if fix:
-                if self.install_missing_packages(missing_packages):
-                    packages_ok = True
         
         # Check AI backends
         available_backends, missing_backends = self.check_ai_backends()
         if not available_backends:
             all_good = False
-            if fix and missing_backends:
-                if self.install_missing_packages(missing_backends):
+        
+        # Install everything that is missing with a single pip invocation
+        if fix:
+            to_install = [] if packages_ok else list(missing_packages)
+            if not available_backends:
+                to_install += missing_backends
+            if to_install and self.install_missing_packages(to_install):
+                packages_ok = True
+                if not available_backends:
                     available_backends = missing_backends
         
         # Check models
         models_found = self.check_models()
         if not models_found:
-            print("\n💡 Tip: Run 'python download_models.py' to download AI models")
+            self._log("\n💡 Tip: Run 'python download_models.py' to download AI models")
         
-        print("\n" + "=" * 40)
+        self._log("\n" + "=" * 40)
         
         if all_good and models_found:
-            print("✅ All dependencies satisfied! OANA should work perfectly.")
+            self._log("✅ All dependencies satisfied! OANA should work perfectly.")
         elif packages_ok and available_backends:
-            print("✅ Core dependencies satisfied! Download models to enable AI features.")
+            self._log("✅ Core dependencies satisfied! Download models to enable AI features.")
         else:
-            print("❌ Missing dependencies. OANA may not work properly.")
-            print("\nQuick fix commands:")
+            self._log("❌ Missing dependencies. OANA may not work properly.", level="error")
+            self._log("\nQuick fix commands:", level="error")
             if missing_packages:
-                print(f"pip install {' '.join(missing_packages)}")
+                self._log(f"pip install {' '.join(missing_packages)}", level="error")
             if not available_backends:
-                print("pip install llama-cpp-python")
+                self._log("pip install llama-cpp-python", level="error")
             if not models_found:
-                print("python download_models.py")
+                self._log("python download_models.py", level="error")
         
         return all_good and models_found
 
@@ -199,10 +376,12 @@ def main():
                        help="Try to install missing packages automatically")
     parser.add_argument("--quiet", "-q", action="store_true",
                        help="Only show errors and warnings")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore cached import probe results")
     
     args = parser.parse_args()
     
-    checker = DependencyChecker()
+    checker = DependencyChecker(use_cache=not args.no_cache, quiet=args.quiet)
     success = checker.run_full_check(fix=args.fix)
     
     sys.exit(0 if success else 1)
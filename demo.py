@@ -4,6 +4,9 @@ Quick demo script to test the application functionality
 
 import sys
 import os
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from ai_engine import AIEngine
@@ -14,53 +17,79 @@ from summarizer import Summarizer
 def test_components():
     print("🧪 Testing Application Components")
     print("=" * 40)
-    
-    # Test AI Engine
-    print("1. Testing AI Engine...")
-    try:
-        ai = AIEngine()
-        print(f"   Backend: {ai.backend}")
-        print(f"   Ready: {ai.is_ready()}")
-        
-        # Test response generation
-        response = ai.generate_response("Hello, how are you?")
-        print(f"   Sample response: {response[:100]}...")
-        print("   ✅ AI Engine works")
-    except Exception as e:
-        print(f"   ❌ AI Engine error: {e}")
-    
-    # Test PDF Parser
-    print("\n2. Testing PDF Parser...")
-    try:
-        pdf_parser = PDFParser()
-        print(f"   Available: {pdf_parser.is_available()}")
-        print("   ✅ PDF Parser ready")
-    except Exception as e:
-        print(f"   ❌ PDF Parser error: {e}")
-    
-    # Test DOCX Parser  
-    print("\n3. Testing DOCX Parser...")
-    try:
-        docx_parser = DocxParser()
-        print(f"   Available: {docx_parser.is_available()}")
-        print("   ✅ DOCX Parser ready")
-    except Exception as e:
-        print(f"   ❌ DOCX Parser error: {e}")
-    
-    # Test Summarizer
-    print("\n4. Testing Summarizer...")
+
+    # Load the AI engine once and share it; model loading dominates the demo
     try:
         ai = AIEngine()
-        summarizer = Summarizer(ai)
-        
-        test_text = "This is a test document with some text content. It contains multiple sentences to test the summarization functionality. The summarizer should be able to process this text and create a meaningful summary."
-        
-        summary = summarizer.summarize(test_text, max_length=100)
-        print(f"   Sample summary: {summary[:100]}...")
-        print("   ✅ Summarizer works")
+        ai_error = None
     except Exception as e:
-        print(f"   ❌ Summarizer error: {e}")
-    
+        ai = None
+        ai_error = e
+
+    # A single llama.cpp context must not be driven from two threads at once
+    ai_lock = threading.Lock()
+
+    def test_ai_engine(out):
+        print("1. Testing AI Engine...", file=out)
+        try:
+            if ai is None:
+                raise ai_error
+            print(f"   Backend: {ai.backend}", file=out)
+            print(f"   Ready: {ai.is_ready()}", file=out)
+
+            # Test response generation
+            with ai_lock:
+                response = ai.generate_response("Hello, how are you?")
+            print(f"   Sample response: {response[:100]}...", file=out)
+            print("   ✅ AI Engine works", file=out)
+        except Exception as e:
+            print(f"   ❌ AI Engine error: {e}", file=out)
+
+    def test_pdf_parser(out):
+        print("\n2. Testing PDF Parser...", file=out)
+        try:
+            pdf_parser = PDFParser()
+            print(f"   Available: {pdf_parser.is_available()}", file=out)
+            print("   ✅ PDF Parser ready", file=out)
+        except Exception as e:
+            print(f"   ❌ PDF Parser error: {e}", file=out)
+
+    def test_docx_parser(out):
+        print("\n3. Testing DOCX Parser...", file=out)
+        try:
+            docx_parser = DocxParser()
+            print(f"   Available: {docx_parser.is_available()}", file=out)
+            print("   ✅ DOCX Parser ready", file=out)
+        except Exception as e:
+            print(f"   ❌ DOCX Parser error: {e}", file=out)
+
+    def test_summarizer(out):
+        print("\n4. Testing Summarizer...", file=out)
+        try:
+            if ai is None:
+                raise ai_error
+            summarizer = Summarizer(ai)
+
+            test_text = "This is a test document with some text content. It contains multiple sentences to test the summarization functionality. The summarizer should be able to process this text and create a meaningful summary."
+
+            with ai_lock:
+                summary = summarizer.summarize(test_text, max_length=100)
+            print(f"   Sample summary: {summary[:100]}...", file=out)
+            print("   ✅ Summarizer works", file=out)
+        except Exception as e:
+            print(f"   ❌ Summarizer error: {e}", file=out)
+
+    tests = [test_ai_engine, test_pdf_parser, test_docx_parser, test_summarizer]
+    buffers = [io.StringIO() for _ in tests]
+
+    with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+        for future in [pool.submit(test, out) for test, out in zip(tests, buffers)]:
+            future.result()
+
+    # Report in declaration order regardless of completion order
+    for out in buffers:
+        sys.stdout.write(out.getvalue())
+
     print("\n🎉 Component testing complete!")
 
 if __name__ == "__main__":
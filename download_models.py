@@ -5,73 +5,367 @@ Downloads recommended AI models from Hugging Face
 """
 
 import os
+import re
 import sys
+import hashlib
+import itertools
+import queue
+import socket
+import threading
+import time
+from contextlib import closing
 import urllib.request
 import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 import json
 
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+    NETWORK_ERRORS = (urllib.error.URLError, requests.RequestException)
+except ImportError:
+    REQUESTS_AVAILABLE = False
+    NETWORK_ERRORS = (urllib.error.URLError,)
+
+# Parallel downloads per batch; kept low to stay clear of Hugging Face rate limits
+MAX_CONCURRENT_DOWNLOADS = 2
+
+# Read size for download streams and minimum seconds between progress updates
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PROGRESS_INTERVAL = 0.25
+
+# Large files are fetched as this many parallel byte ranges when the server allows it
+DOWNLOAD_SEGMENTS = 4
+SEGMENTED_MIN_SIZE = 64 * 1024 * 1024
+
+# Bytes written between page cache releases while streaming a download
+CACHE_RELEASE_INTERVAL = 64 * 1024 * 1024
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Surface redirects as HTTPError so their headers can be read"""
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A downloadable model and where to fetch it from"""
+    name: str
+    filename: str
+    size: str
+    description: str
+    url: str
+    recommended: bool = False
+    sha256: Optional[str] = None
+
+
+# Recommended models with direct download links
+RECOMMENDED_MODELS = (
+    ModelSpec(
+        name="TinyLlama-1.1B-Chat",
+        filename="tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
+        size="637 MB",
+        description="Lightweight model, good for basic chat",
+        url="https://huggingface.co/TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF/resolve/main/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
+        recommended=True
+    ),
+    ModelSpec(
+        name="Phi-2",
+        filename="phi-2.Q4_K_M.gguf",
+        size="1.6 GB",
+        description="Microsoft Phi-2, excellent quality",
+        url="https://huggingface.co/TheBloke/phi-2-GGUF/resolve/main/phi-2.Q4_K_M.gguf",
+        recommended=True
+    ),
+    ModelSpec(
+        name="Llama-2-7B-Chat",
+        filename="llama-2-7b-chat.Q4_K_M.gguf",
+        size="4.1 GB",
+        description="High quality conversational AI",
+        url="https://huggingface.co/TheBloke/Llama-2-7B-Chat-GGUF/resolve/main/llama-2-7b-chat.Q4_K_M.gguf",
+        recommended=False
+    ),
+    ModelSpec(
+        name="CodeLlama-7B",
+        filename="codellama-7b-instruct.Q4_K_M.gguf",
+        size="4.1 GB",
+        description="Specialized for code generation",
+        url="https://huggingface.co/TheBloke/CodeLlama-7B-Instruct-GGUF/resolve/main/codellama-7b-instruct.Q4_K_M.gguf",
+        recommended=False
+    ),
+)
+
+
 class ModelDownloader:
     def __init__(self):
         self.models_dir = Path(__file__).parent / "models"
         self.models_dir.mkdir(exist_ok=True)
+        self._cancel = threading.Event()
+        self._model_cache = None  # (models dir mtime, [(filename, size)])
+        self._probed = {}  # url -> (content length, accepts byte ranges) from a batch probe
+        
+        # One session for every download so the TLS connection to huggingface.co is reused
+        self.session = requests.Session() if REQUESTS_AVAILABLE else None
         
-        # Recommended models with direct download links
-        self.recommended_models = [
-            {
-                "name": "TinyLlama-1.1B-Chat",
-                "filename": "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
-                "size": "637 MB",
-                "description": "Lightweight model, good for basic chat",
-                "url": "https://huggingface.co/TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF/resolve/main/tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
-                "recommended": True
-            },
-            {
-                "name": "Phi-2",
-                "filename": "phi-2.Q4_K_M.gguf", 
-                "size": "1.6 GB",
-                "description": "Microsoft Phi-2, excellent quality",
-                "url": "https://huggingface.co/TheBloke/phi-2-GGUF/resolve/main/phi-2.Q4_K_M.gguf",
-                "recommended": True
-            },
-            {
-                "name": "Llama-2-7B-Chat",
-                "filename": "llama-2-7b-chat.Q4_K_M.gguf",
-                "size": "4.1 GB", 
-                "description": "High quality conversational AI",
-                "url": "https://huggingface.co/TheBloke/Llama-2-7B-Chat-GGUF/resolve/main/llama-2-7b-chat.Q4_K_M.gguf",
-                "recommended": False
-            },
-            {
-                "name": "CodeLlama-7B",
-                "filename": "codellama-7b-instruct.Q4_K_M.gguf",
-                "size": "4.1 GB",
-                "description": "Specialized for code generation",
-                "url": "https://huggingface.co/TheBloke/CodeLlama-7B-Instruct-GGUF/resolve/main/codellama-7b-instruct.Q4_K_M.gguf", 
-                "recommended": False
-            }
-        ]
+        self.recommended_models = RECOMMENDED_MODELS
+        
+    def _prewarm_dns(self, urls):
+        """Resolve the download hosts in the background so the first requests skip the lookup"""
+        def resolve(host):
+            try:
+                socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+            except OSError:
+                pass  # The download itself will report the failure
+                
+        for host in {urllib.parse.urlsplit(url).hostname for url in urls}:
+            threading.Thread(target=resolve, args=(host,), daemon=True).start()
+            
+    def _scan_models(self):
+        """Return [(filename, size)] for the .gguf files in models/, cached until the directory changes"""
+        dir_mtime = os.stat(self.models_dir).st_mtime_ns
+        if self._model_cache is None or self._model_cache[0] != dir_mtime:
+            with os.scandir(self.models_dir) as entries:
+                models = [(entry.name, entry.stat().st_size) for entry in entries
+                          if entry.name.endswith(".gguf") and entry.is_file()]
+            self._model_cache = (dir_mtime, models)
+        return self._model_cache[1]
         
     def list_models(self):
         """List available models"""
         print("🤖 Available AI Models")
         print("=" * 50)
         
+        downloaded = dict(self._scan_models())
         for i, model in enumerate(self.recommended_models, 1):
-            status = "⭐ RECOMMENDED" if model["recommended"] else ""
-            print(f"{i}. {model['name']} {status}")
-            print(f"   Size: {model['size']}")
-            print(f"   Description: {model['description']}")
+            status = "⭐ RECOMMENDED" if model.recommended else ""
+            print(f"{i}. {model.name} {status}")
+            print(f"   Size: {model.size}")
+            print(f"   Description: {model.description}")
             
             # Check if already downloaded
-            local_path = self.models_dir / model['filename']
-            if local_path.exists():
-                size_mb = local_path.stat().st_size / (1024 * 1024)
+            if model.filename in downloaded:
+                size_mb = downloaded[model.filename] / (1024 * 1024)
                 print(f"   Status: ✅ Downloaded ({size_mb:.1f} MB)")
             else:
                 print(f"   Status: ⬇️  Available for download")
             print()
             
+    def _open(self, url, headers):
+        """Open url for streaming; returns (status, content length, body)"""
+        if self.session is None:
+            try:
+                body = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30)
+            except urllib.error.HTTPError as e:
+                if e.code == 416:
+                    return 416, 0, None
+                raise
+            return body.status, int(body.headers.get("Content-Length", 0)), body
+            
+        response = self.session.get(url, headers=headers, stream=True, timeout=30)
+        if response.status_code == 416:
+            response.close()
+            return 416, 0, None
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response.status_code, int(response.headers.get("Content-Length", 0)), response.raw
+        
+    def _head(self, url):
+        """Return (content length, accepts byte ranges) for url"""
+        if self.session is None:
+            with urllib.request.urlopen(urllib.request.Request(url, method="HEAD"), timeout=30) as response:
+                headers = response.headers
+        else:
+            response = self.session.head(url, allow_redirects=True, timeout=30)
+            response.raise_for_status()
+            headers = response.headers
+        return int(headers.get("Content-Length", 0)), headers.get("Accept-Ranges") == "bytes"
+        
+    def _probe(self, url):
+        """Like _head, but treat an unreachable or HEAD-less server as unknown"""
+        try:
+            return self._head(url)
+        except NETWORK_ERRORS:
+            return 0, False
+            
+    def _fetch_segments(self, url, part_path, total_size, progress_hook):
+        """Download url as parallel byte ranges written in place into part_path"""
+        bounds = [total_size * i // DOWNLOAD_SEGMENTS for i in range(DOWNLOAD_SEGMENTS + 1)]
+        done = [0] * DOWNLOAD_SEGMENTS
+        stop = threading.Event()
+        
+        with open(part_path, 'wb') as f:
+            f.truncate(total_size)
+            
+        def fetch_segment(index):
+            start, end = bounds[index], bounds[index + 1]
+            status, _, body = self._open(url, {"Range": f"bytes={start}-{end - 1}"})
+            if status != 206:
+                if body is not None:
+                    body.close()
+                raise urllib.error.URLError(f"server ignored range request (HTTP {status})")
+            with closing(body), open(part_path, 'r+b') as f:
+                f.seek(start)
+                while done[index] < end - start and not stop.is_set():
+                    chunk = body.read(min(DOWNLOAD_CHUNK_SIZE, end - start - done[index]))
+                    if not chunk:
+                        raise urllib.error.URLError(f"segment {index + 1} closed early")
+                    f.write(chunk)
+                    done[index] += len(chunk)
+                    
+        pool = ThreadPoolExecutor(max_workers=DOWNLOAD_SEGMENTS)
+        try:
+            pending = [pool.submit(fetch_segment, i) for i in range(DOWNLOAD_SEGMENTS)]
+            while pending:
+                finished, pending = wait(pending, timeout=PROGRESS_INTERVAL)
+                for future in finished:
+                    future.result()
+                progress_hook(sum(done), total_size)
+        except BaseException:
+            stop.set()
+            pool.shutdown(wait=True)
+            # Keep only the contiguous head of the file so a plain Range resume can continue it
+            with open(part_path, 'r+b') as f:
+                f.truncate(done[0])
+            raise
+        pool.shutdown(wait=True)
+        
+    def _expected_sha256(self, model):
+        """Return the SHA-256 a model file should have, or None if unknown"""
+        if model.sha256:
+            return model.sha256.lower()
+            
+        # Hugging Face reports the LFS object hash on the redirect to its CDN
+        try:
+            if self.session is None:
+                try:
+                    response = urllib.request.build_opener(_NoRedirect).open(
+                        urllib.request.Request(model.url, method="HEAD"), timeout=30)
+                    headers = response.headers
+                    response.close()
+                except urllib.error.HTTPError as e:
+                    headers = e.headers
+            else:
+                headers = self.session.head(model.url, allow_redirects=False, timeout=30).headers
+        except NETWORK_ERRORS:
+            return None
+        etag = (headers.get("X-Linked-Etag") or "").strip('"').lower()
+        return etag if SHA256_PATTERN.match(etag) else None
+        
+    def _hash_file(self, path, digest):
+        """Feed the contents of path into digest"""
+        with open(path, 'rb', buffering=0) as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest
+        
+    def _write_chunks(self, f, chunks, digest):
+        """Drain chunks into f, hashing them on the way; runs on its own thread"""
+        # The file is written once and read again only when a model loads, so on
+        # Linux drop flushed pages instead of letting gigabytes crowd the page cache
+        advise = hasattr(os, "posix_fadvise")
+        if advise:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        synced = f.tell()
+        
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            f.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+                
+            if advise and f.tell() - synced >= CACHE_RELEASE_INTERVAL:
+                f.flush()
+                os.fdatasync(f.fileno())
+                os.posix_fadvise(f.fileno(), synced, f.tell() - synced, os.POSIX_FADV_DONTNEED)
+                synced = f.tell()
+                
+    def _put_chunk(self, chunks, chunk, writer):
+        """Queue chunk for the writer thread, surfacing its error if it died"""
+        while True:
+            try:
+                chunks.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                if writer.done():
+                    writer.result()
+                    return
+        
+    def _fetch(self, url, local_path, progress_hook, digest=None):
+        """Fetch url into local_path, resuming from a leftover .part file
+        
+        Returns True when digest was fed the whole file while streaming.
+        """
+        part_path = local_path.with_name(local_path.name + ".part")
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        
+        if not resume_from:
+            total_size, accepts_ranges = self._probed.pop(url, None) or self._probe(url)
+            if accepts_ranges and total_size >= SEGMENTED_MIN_SIZE:
+                self._fetch_segments(url, part_path, total_size, progress_hook)
+                os.replace(part_path, local_path)
+                return False
+                
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else {}
+        
+        status, length, body = self._open(url, headers)
+        if status == 416:
+            # Range starts at the end of the file: the .part is already complete
+            os.replace(part_path, local_path)
+            return False
+        if status != 206:
+            # Server ignored the Range header and is sending the whole file
+            resume_from = 0
+        if resume_from:
+            print(f"↩️  Resuming {local_path.name} from {resume_from / (1024 * 1024):.1f} MB")
+            if digest is not None:
+                self._hash_file(part_path, digest)
+                
+        total_size = resume_from + length if length else 0
+        downloaded = resume_from
+        last_report = 0.0
+        
+        # Disk writes and hashing run on a second thread so they overlap the network reads
+        chunks = queue.Queue(maxsize=4)
+        
+        # Reused receive buffers: the queue plus one at the writer plus one being filled
+        # are the most ever in use, so recycling them never clobbers pending data
+        buffers = [bytearray(DOWNLOAD_CHUNK_SIZE) for _ in range(chunks.maxsize + 2)]
+        with closing(body), open(part_path, 'ab' if resume_from else 'wb') as f, \
+                ThreadPoolExecutor(max_workers=1) as pool:
+            writer = pool.submit(self._write_chunks, f, chunks, digest)
+            try:
+                for index in itertools.count():
+                    buffer = buffers[index % len(buffers)]
+                    count = body.readinto(buffer)
+                    if not count:
+                        break
+                    self._put_chunk(chunks, memoryview(buffer)[:count], writer)
+                    downloaded += count
+                    
+                    # Printing every chunk would cost more than the copy on a fast link
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        progress_hook(downloaded, total_size)
+                progress_hook(downloaded, total_size)
+            finally:
+                if not writer.done():
+                    chunks.put(None)
+            writer.result()
+            
+        if total_size and downloaded < total_size:
+            raise urllib.error.URLError(f"connection closed after {downloaded} of {total_size} bytes")
+        os.replace(part_path, local_path)
+        return True
+        
     def download_model(self, model_index):
         """Download a specific model"""
         if model_index < 1 or model_index > len(self.recommended_models):
@@ -79,66 +373,92 @@ class ModelDownloader:
             return False
             
         model = self.recommended_models[model_index - 1]
-        local_path = self.models_dir / model['filename']
+        local_path = self.models_dir / model.filename
         
         if local_path.exists():
-            print(f"✅ Model {model['name']} already exists")
+            print(f"✅ Model {model.name} already exists")
             return True
             
-        print(f"📥 Downloading {model['name']} ({model['size']})...")
-        print(f"URL: {model['url']}")
+        print(f"📥 Downloading {model.name} ({model.size})...")
+        print(f"URL: {model.url}")
         print(f"Destination: {local_path}")
         print()
         
         try:
-            def progress_hook(block_num, block_size, total_size):
+            def progress_hook(downloaded, total_size):
+                if self._cancel.is_set():
+                    raise KeyboardInterrupt
                 if total_size > 0:
-                    percent = block_num * block_size * 100 / total_size
-                    downloaded = block_num * block_size
+                    percent = downloaded * 100 / total_size
                     downloaded_mb = downloaded / (1024 * 1024)
                     total_mb = total_size / (1024 * 1024)
                     
-                    print(f"\rProgress: {percent:.1f}% ({downloaded_mb:.1f}/{total_mb:.1f} MB)", end="")
+                    print(f"\r{model.name}: {percent:.1f}% ({downloaded_mb:.1f}/{total_mb:.1f} MB)", end="")
                     
-            urllib.request.urlretrieve(model['url'], local_path, progress_hook)
-            print(f"\n✅ Successfully downloaded {model['name']}")
+            expected_sha256 = self._expected_sha256(model)
+            digest = hashlib.sha256() if expected_sha256 else None
+            
+            hashed = self._fetch(model.url, local_path, progress_hook, digest)
+            if digest is not None and not hashed:
+                digest = self._hash_file(local_path, hashlib.sha256())
+            if digest is not None and digest.hexdigest() != expected_sha256:
+                print(f"\n❌ {model.name} failed its SHA-256 check, removing the corrupt file")
+                local_path.unlink()
+                return False
+            print(f"\n✅ Successfully downloaded {model.name}")
             return True
             
-        except urllib.error.URLError as e:
+        except NETWORK_ERRORS as e:
             print(f"\n❌ Download failed: {e}")
-            if local_path.exists():
-                local_path.unlink()  # Remove partial file
+            print("   Run the download again to resume where it stopped")
             return False
         except KeyboardInterrupt:
             print(f"\n⚠️  Download cancelled by user")
-            if local_path.exists():
-                local_path.unlink()  # Remove partial file
+            print("   Run the download again to resume where it stopped")
             return False
         except Exception as e:
             print(f"\n❌ Unexpected error: {e}")
-            if local_path.exists():
-                local_path.unlink()  # Remove partial file
             return False
             
     def download_recommended(self):
         """Download all recommended models"""
-        recommended = [i for i, model in enumerate(self.recommended_models, 1) if model["recommended"]]
+        recommended = [i for i, model in enumerate(self.recommended_models, 1) if model.recommended]
         
         print(f"📥 Downloading {len(recommended)} recommended models...")
         print()
         
-        success_count = 0
-        for model_index in recommended:
-            if self.download_model(model_index):
-                success_count += 1
-            print()
+        self._prewarm_dns(self.recommended_models[i - 1].url for i in recommended)
+        
+        # Probe every missing file at once, then start the largest first so the
+        # bounded pool doesn't end with one big download running on its own
+        missing_urls = [self.recommended_models[i - 1].url for i in recommended
+                        if not (self.models_dir / self.recommended_models[i - 1].filename).exists()]
+        if missing_urls:
+            with ThreadPoolExecutor(max_workers=len(missing_urls)) as pool:
+                self._probed.update(zip(missing_urls, pool.map(self._probe, missing_urls)))
+        recommended.sort(key=lambda i: self._probed.get(self.recommended_models[i - 1].url, (0, False))[0],
+                         reverse=True)
+        
+        # Downloads are network-bound, so overlapping them cuts total wall time
+        self._cancel.clear()
+        pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS)
+        try:
+            results = list(pool.map(self.download_model, recommended))
+        except KeyboardInterrupt:
+            # Make in-flight downloads stop at their next progress update
+            self._cancel.set()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+        print()
             
+        success_count = sum(1 for ok in results if ok)
         print(f"✅ Downloaded {success_count}/{len(recommended)} recommended models")
         
     def get_model_info(self, filename):
         """Get information about a model file"""
         for model in self.recommended_models:
-            if model['filename'] == filename:
+            if model.filename == filename:
                 return model
         return None
         
@@ -189,7 +509,7 @@ class ModelDownloader:
         print("\n📁 Downloaded Models")
         print("=" * 30)
         
-        model_files = list(self.models_dir.glob("*.gguf"))
+        model_files = self._scan_models()
         
         if not model_files:
             print("❌ No model files found in models/ directory")
@@ -197,19 +517,19 @@ class ModelDownloader:
             return
             
         total_size = 0
-        for model_file in model_files:
-            size_mb = model_file.stat().st_size / (1024 * 1024)
+        for filename, size in model_files:
+            size_mb = size / (1024 * 1024)
             total_size += size_mb
             
             # Try to get model info
-            model_info = self.get_model_info(model_file.name)
+            model_info = self.get_model_info(filename)
             if model_info:
-                print(f"✅ {model_info['name']}")
-                print(f"   File: {model_file.name}")
+                print(f"✅ {model_info.name}")
+                print(f"   File: {filename}")
                 print(f"   Size: {size_mb:.1f} MB")
-                print(f"   Description: {model_info['description']}")
+                print(f"   Description: {model_info.description}")
             else:
-                print(f"✅ {model_file.name}")
+                print(f"✅ {filename}")
                 print(f"   Size: {size_mb:.1f} MB")
                 print(f"   Description: Custom model")
             print()
@@ -11,9 +11,63 @@ import json
 import urllib.request
 import shutil
 import platform
+import threading
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import importlib
+import importlib.util
 from pathlib import Path
 
+# Default user settings, serialized once since they never change at runtime
+DEFAULT_SETTINGS = {
+    "theme": "light",
+    "auto_save_chat": True,
+    "chat_history_limit": 1000,
+    "auto_export_format": "txt",
+    "ui_settings": {
+        "font_size": 10,
+        "show_timestamps": True,
+        "compact_mode": False
+    },
+    "ai_settings": {
+        "temperature": 0.7,
+        "max_tokens": 512,
+        "system_prompt": "You are OANA, a helpful offline AI assistant."
+    },
+    "model_settings": {
+        "preferred_backend": "llama-cpp",
+        "model_path": "",
+        "auto_load": False
+    }
+}
+DEFAULT_SETTINGS_JSON = json.dumps(DEFAULT_SETTINGS, indent=2).encode('utf-8')
+
+MB = 1 << 20
+
+# pip output lines worth echoing as install progress
+PIP_PROGRESS_PREFIXES = ("Collecting", "Building wheel", "Installing collected", "Successfully installed")
+
+class _ThreadStdout:
+    """sys.stdout stand-in that buffers the output of threads that asked for it"""
+    def __init__(self, default):
+        self.default = default
+        self._local = threading.local()
+        
+    def start(self):
+        self._local.buffer = io.StringIO()
+        
+    def stop(self):
+        buffer = self._local.buffer
+        del self._local.buffer
+        return buffer.getvalue()
+        
+    def write(self, text):
+        return getattr(self._local, "buffer", self.default).write(text)
+        
+    def flush(self):
+        getattr(self._local, "buffer", self.default).flush()
+
+
 class OANASetup:
     def __init__(self):
         self.project_root = Path(__file__).parent.resolve()
@@ -22,6 +76,12 @@ class OANASetup:
         self.logs_dir = self.project_root / "logs"
         self.utils_dir = self.project_root / "utils"
         
+        # Persistent cache so re-running setup doesn't refetch packages
+        self.cache_dir = Path.home() / ".cache" / "oana"
+        self.pip_env = dict(os.environ)
+        self.pip_env.setdefault("PIP_CACHE_DIR", str(self.cache_dir / "pip"))
+        self._models_cache = {}  # directory -> [(filename, size)]
+        
         # Platform detection
         self.is_windows = platform.system() == "Windows"
         self.is_linux = platform.system() == "Linux"
@@ -46,20 +106,42 @@ class OANASetup:
             # Step 2: Directory structure
             self.create_directories()
             
-            # Step 3: Dependencies
-            if dev_mode:
-                self.setup_development_environment()
-            else:
-                self.install_dependencies()
-                
-            # Step 4: Database initialization
-            self.initialize_database()
+            # Step 3: Dependencies, installed in the background while the local
+            # steps below run; only the backend prompt has to happen first
+            ai_backend = self.choose_ai_backend()
+            installer = self.setup_development_environment if dev_mode else self.install_dependencies
             
-            # Step 5: Configuration
-            self.create_default_configs()
+            # The installer's output is buffered and shown in one block once it
+            # is done, so it doesn't interleave with the steps below
+            install_log = []
             
-            # Step 6: Model management
-            self.setup_model_management()
+            def run_installer():
+                output.start()
+                try:
+                    return installer(ai_backend)
+                finally:
+                    install_log.append(output.stop())
+                    
+            output = sys.stdout = _ThreadStdout(sys.stdout)
+            pool = ThreadPoolExecutor(max_workers=1)
+            install = pool.submit(run_installer)
+            try:
+                # Step 4: Database initialization
+                self.initialize_database()
+                
+                # Step 5: Configuration
+                self.create_default_configs()
+                
+                # Step 6: Model management
+                self.setup_model_management()
+            finally:
+                pool.shutdown(wait=True)
+                sys.stdout = output.default
+                
+            print("".join(install_log), end="")
+            failed = install.result()
+            if failed:
+                print(f"⚠️  {len(failed)} package(s) failed to install: {', '.join(failed)}")
             
             # Step 7: Final validation
             self.validate_installation()
@@ -118,12 +200,12 @@ class OANASetup:
             directory.mkdir(parents=True, exist_ok=True)
             print(f"✅ {directory.relative_to(self.project_root)}")
             
-    def setup_development_environment(self):
+    def setup_development_environment(self, ai_backend=None):
         """Setup development environment with additional tools"""
         print("🔧 Setting up development environment...")
         
         # Install main requirements first
-        self.install_dependencies()
+        return self.install_dependencies(ai_backend)
         
     def initialize_database(self):
         """Initialize SQLite database"""
@@ -145,51 +227,33 @@ class OANASetup:
         """Create default configuration files"""
         print("⚙️ Creating default configurations...")
         
-        # Default settings
-        default_settings = {
-            "theme": "light",
-            "auto_save_chat": True,
-            "chat_history_limit": 1000,
-            "auto_export_format": "txt",
-            "ui_settings": {
-                "font_size": 10,
-                "show_timestamps": True,
-                "compact_mode": False
-            },
-            "ai_settings": {
-                "temperature": 0.7,
-                "max_tokens": 512,
-                "system_prompt": "You are OANA, a helpful offline AI assistant."
-            },
-            "model_settings": {
-                "preferred_backend": "llama-cpp",
-                "model_path": "",
-                "auto_load": False
-            }
-        }
-        
         config_file = self.project_root / "user_settings.json"
         if not config_file.exists():
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_settings, f, indent=2)
+            config_file.write_bytes(DEFAULT_SETTINGS_JSON)
             print("✅ Default settings created")
         else:
             print("✅ Settings file exists")
             
+    def _list_gguf(self, directory):
+        """Return [(filename, size)] for the .gguf files in directory, listed once per setup run"""
+        key = str(directory)
+        if key not in self._models_cache:
+            with os.scandir(directory) as entries:
+                self._models_cache[key] = [(entry.name, entry.stat().st_size) for entry in entries
+                                           if entry.name.endswith(".gguf") and entry.is_file()]
+        return self._models_cache[key]
+            
     def setup_model_management(self):
         """Setup model management"""
         print("🤖 Setting up model management...")
         
         # Check for existing models
-        model_files = list(self.models_dir.glob("*.gguf"))
+        model_files = self._list_gguf(self.models_dir) if os.path.isdir(self.models_dir) else []
         if model_files:
             print(f"✅ Found {len(model_files)} model(s)")
-            for model in model_files:
-                try:
-                    size_mb = model.stat().st_size / (1024*1024)
-                    print(f"   - {model.name} ({size_mb:.1f}MB)")
-                except:
-                    print(f"   - {model.name}")
+            for name, size in model_files:
+                size_mb = size / MB
+                print(f"   - {name} ({size_mb:.1f}MB)")
         else:
             print("⚠️  No models found")
             print("   Download models through the application menu")
@@ -206,18 +270,25 @@ class OANASetup:
             "requirements.txt"
         ]
         
+        # One directory listing per folder instead of a stat per file
+        listings = {}
         for file_path in critical_files:
-            full_path = self.project_root / file_path
-            if full_path.exists():
+            directory, _, name = file_path.rpartition("/")
+            if directory not in listings:
+                try:
+                    listings[directory] = set(os.listdir(self.project_root / directory))
+                except OSError:
+                    listings[directory] = set()
+            if name in listings[directory]:
                 print(f"✅ {file_path}")
             else:
                 print(f"❌ Missing: {file_path}")
                 
-        # Test imports
-        try:
-            import tkinter
+        # Locate tkinter without running its initialization; _tkinter is the compiled part
+        # that Linux distributions often ship separately
+        if importlib.util.find_spec("tkinter") and importlib.util.find_spec("_tkinter"):
             print("✅ Tkinter available")
-        except ImportError:
+        else:
             print("❌ Tkinter not available")
             
     def print_success_message(self, dev_mode=False):
@@ -240,15 +311,17 @@ class OANASetup:
         print("🐛 Issues: https://github.com/ivocreates/OANA-Offline-Ai-and-Note-Assistant/issues")
         print("=" * 60)
             
-    def install_dependencies(self):
-        """Install required dependencies"""
+    def install_dependencies(self, ai_backend=None):
+        """Install required dependencies; ai_backend skips the backend prompt
+        
+        Returns the requirements that failed to install.
+        """
         print("Installing dependencies...")
         
         requirements_file = self.project_root / "requirements.txt"
         if not requirements_file.exists():
             raise Exception("requirements.txt not found")
             
-        # Install basic requirements first
         basic_requirements = [
             "PyMuPDF>=1.23.0",
             "python-docx>=0.8.11",
@@ -257,22 +330,89 @@ class OANASetup:
             "numpy>=1.24.0"
         ]
         
-        print("Installing basic requirements...")
-        for req in basic_requirements:
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", req], 
-                             check=True, capture_output=True)
+        # Ask for the AI backend up front so it joins the same pip run
+        if ai_backend is None:
+            ai_backend = self.choose_ai_backend()
+        requirements = basic_requirements + ai_backend
+        
+        # Skip pip entirely for what's already installed at a matching version
+        missing = self._unsatisfied_requirements(requirements)
+        if missing is not None:
+            for req in requirements:
+                if req not in missing:
+                    print(f"✓ Already installed {req}")
+            requirements = missing
+        if not requirements:
+            print("✓ Dependencies installation completed")
+            return []
+            
+        failed = []
+        print("Installing requirements...")
+        # One pip run resolves and fetches the index once for the whole set
+        if self._run_pip(requirements) == 0:
+            for req in requirements:
                 print(f"✓ Installed {req}")
-            except subprocess.CalledProcessError as e:
-                print(f"⚠️  Warning: Failed to install {req}")
-                
-        # Try to install AI backend
-        self.install_ai_backend()
-        
+        else:
+            # pip installs all or nothing, so retry each package on its own to find the
+            # culprit; the packages don't depend on each other, so the retries run in parallel
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = {pool.submit(self._run_pip, [req], False): req for req in requirements}
+                for future in as_completed(futures):
+                    req = futures[future]
+                    if future.result() == 0:
+                        print(f"✓ Installed {req}")
+                        continue
+                    failed.append(req)
+                    if req in ai_backend:
+                        print(f"⚠️  Failed to install {req}")
+                        print("You can install it manually later with: pip install llama-cpp-python")
+                    else:
+                        print(f"⚠️  Warning: Failed to install {req}")
+                        
         print("✓ Dependencies installation completed")
-        
-    def install_ai_backend(self):
-        """Install AI backend with user choice"""
+        return failed
+        
+    def _run_pip(self, requirements, show_progress=True):
+        """pip install requirements, streaming its output; returns the exit code
+        
+        Output is read line by line as it arrives rather than buffered until
+        exit, so a long native build shows progress and doesn't pile up in memory.
+        """
+        process = subprocess.Popen([sys.executable, "-m", "pip", "install", "--no-input",
+                                    "--disable-pip-version-check", *requirements],
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, errors="replace", bufsize=1, env=self.pip_env)
+        with process.stdout:
+            for line in process.stdout:
+                if line.startswith("ERROR") or (show_progress and line.startswith(PIP_PROGRESS_PREFIXES)):
+                    print(f"   {line.rstrip()}")
+        return process.wait()
+        
+    def _unsatisfied_requirements(self, requirements):
+        """Return the requirements not met by installed distributions
+        
+        Returns None when `packaging` is unavailable to decide, in which
+        case pip should be given everything.
+        """
+        try:
+            from importlib import metadata
+            from packaging.requirements import Requirement
+        except ImportError:
+            return None
+            
+        missing = []
+        for line in requirements:
+            req = Requirement(line)
+            try:
+                version = metadata.version(req.name)
+            except metadata.PackageNotFoundError:
+                version = None
+            if version is None or not req.specifier.contains(version, prereleases=True):
+                missing.append(line)
+        return missing
+        
+    def choose_ai_backend(self):
+        """Ask which AI backend to install; returns the pip requirements for it"""
         print("\n🤖 Setting up AI Backend")
         print("Choose an AI backend to install:")
         print("1. llama-cpp-python (Recommended - for local GGUF models)")
@@ -283,44 +423,20 @@ class OANASetup:
                 choice = input("Enter choice (1-2): ").strip()
                 
                 if choice == "1":
-                    print("Installing llama-cpp-python...")
-                    try:
-                        subprocess.run([sys.executable, "-m", "pip", "install", "llama-cpp-python>=0.2.0"], 
-                                     check=True)
-                        print("✅ llama-cpp-python installed successfully")
-                        break
-                    except subprocess.CalledProcessError:
-                        print("⚠️  Failed to install llama-cpp-python")
-                        print("You can install it manually later with: pip install llama-cpp-python")
-                        break
-                        
+                    return ["llama-cpp-python>=0.2.0"]
+                    
                 elif choice == "2":
                     print("⚠️  Skipping AI backend installation")
                     print("Install manually later with one of:")
                     print("  pip install llama-cpp-python")
                     print("  pip install ollama")
-                    break
+                    return []
                 else:
                     print("Invalid choice. Please enter 1 or 2.")
                     
             except KeyboardInterrupt:
                 print("\nSkipping AI backend installation...")
-                break
-        print("Installing AI backend...")
-        ai_backends = [
-            "llama-cpp-python>=0.2.0",
-            # "torch",
-            # "transformers>=4.30.0"
-        ]
-        
-        for backend in ai_backends:
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", backend], 
-                             check=True, capture_output=True, timeout=300)
-                print(f"✓ Installed {backend}")
-                break
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                print(f"⚠️  Failed to install {backend}")
+                return []
                 
     def check_models(self):
         """Check for available models"""
@@ -335,14 +451,14 @@ class OANASetup:
         
         model_found = False
         for models_dir in possible_model_dirs:
-            if models_dir.exists():
-                model_files = list(models_dir.glob("*.gguf"))
+            if os.path.isdir(models_dir):
+                model_files = self._list_gguf(models_dir)
                 if model_files:
                     model_found = True
                     print(f"✅ Found {len(model_files)} GGUF model(s) in {models_dir}")
-                    for model_file in model_files:
-                        size_mb = model_file.stat().st_size / (1024 * 1024)
-                        print(f"   - {model_file.name} ({size_mb:.1f} MB)")
+                    for name, size in model_files:
+                        size_mb = size / MB
+                        print(f"   - {name} ({size_mb:.1f} MB)")
                     break
         
         if not model_found:
@@ -400,6 +516,7 @@ class OANASetup:
             downloader = ModelDownloader()
             print("Starting download of recommended models...")
             downloader.download_recommended()
+            self._models_cache.clear()
             print("✅ Model download completed!")
         except ImportError:
             print("❌ Model downloader not available")
@@ -419,12 +536,20 @@ class OANASetup:
         else:
             print("✓ Using default configuration")
             
-        # Download NLTK data
+        # Download NLTK data; skip the costly import attempt when it isn't installed
+        if importlib.util.find_spec("nltk") is None:
+            print("⚠️  NLTK not installed, skipping NLTK data (not critical)")
+            return
         try:
             import nltk
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            print("✓ Downloaded NLTK data")
+            # Data already on NLTK's search path isn't fetched again; new data goes
+            # to NLTK's default download directory, which every process searches
+            for resource, package in [("tokenizers/punkt", "punkt"), ("corpora/stopwords", "stopwords")]:
+                try:
+                    nltk.data.find(resource)
+                except LookupError:
+                    nltk.download(package, quiet=True)
+            print("✓ NLTK data ready")
         except:
             print("⚠️  NLTK data download failed (not critical)")
             
@@ -8,70 +8,70 @@ from tkinter import ttk
 import sys
 import os
 
+from test_utils import run_tk_for, duration_from_argv
+
 # Add the utils directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
-def test_button_styles():
-    """Test button styles and text visibility"""
-    root = tk.Tk()
+# Button styles with high contrast: configure options plus state maps per style
+BUTTON_STYLES = {
+    "TButton": {
+        "configure": {
+            "padding": (10, 6),
+            "relief": "raised",
+            "borderwidth": 1,
+            "focuscolor": "none",
+            "font": ("Segoe UI", 9, "bold"),
+            "foreground": "#ffffff",
+            "background": "#3498db"
+        },
+        "map": {
+            "background": [('active', '#2980b9'), ('pressed', '#21618c')],
+            "foreground": [('active', '#ffffff'), ('pressed', '#ffffff')],
+            "relief": [('pressed', 'sunken'), ('active', 'raised')]
+        }
+    },
+    "Success.TButton": {
+        "configure": {"foreground": "#ffffff", "background": "#27ae60"},
+        "map": {"background": [('active', '#219a52')], "foreground": [('active', '#ffffff')]}
+    },
+    "Warning.TButton": {
+        "configure": {"foreground": "#ffffff", "background": "#f39c12"},
+        "map": {"background": [('active', '#e67e22')], "foreground": [('active', '#ffffff')]}
+    },
+    "Danger.TButton": {
+        "configure": {"foreground": "#ffffff", "background": "#e74c3c"},
+        "map": {"background": [('active', '#c0392b')], "foreground": [('active', '#ffffff')]}
+    }
+}
+
+def apply_styles(style, table):
+    """Apply a table of ttk style definitions in one pass"""
+    for name, definition in table.items():
+        style.configure(name, **definition.get("configure", {}))
+        style.map(name, **definition.get("map", {}))
+
+def test_button_styles(duration=None, parent=None):
+    """Test button styles and text visibility; closes itself after `duration` seconds if given"""
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
     root.title("Button Visibility Test")
     root.geometry("600x400")
     
     # Configure ttk style
-    style = ttk.Style()
+    style = ttk.Style(root)
     
     # Try to use a theme that supports better customization
-    try:
-        style.theme_use('clam')
-        print("Using 'clam' theme")
-    except:
-        try:
-            style.theme_use('alt')
-            print("Using 'alt' theme")
-        except:
-            print("Using default theme")
+    available_themes = set(style.theme_names())
+    for theme in ('clam', 'alt'):
+        if theme in available_themes:
+            style.theme_use(theme)
+            print(f"Using '{theme}' theme")
+            break
+    else:
+        print("Using default theme")
     
     # Configure button styles with high contrast
-    style.configure("TButton",
-                   padding=(10, 6),
-                   relief="raised",
-                   borderwidth=1,
-                   focuscolor="none",
-                   font=("Segoe UI", 9, "bold"),
-                   foreground="#ffffff",
-                   background="#3498db")
-    
-    style.map("TButton",
-              background=[('active', '#2980b9'),
-                        ('pressed', '#21618c')],
-              foreground=[('active', '#ffffff'),
-                        ('pressed', '#ffffff')],
-              relief=[('pressed', 'sunken'),
-                     ('active', 'raised')])
-    
-    # Success button
-    style.configure("Success.TButton",
-                   foreground="#ffffff",
-                   background="#27ae60")
-    style.map("Success.TButton",
-              background=[('active', '#219a52')],
-              foreground=[('active', '#ffffff')])
-    
-    # Warning button  
-    style.configure("Warning.TButton",
-                   foreground="#ffffff",
-                   background="#f39c12")
-    style.map("Warning.TButton",
-              background=[('active', '#e67e22')],
-              foreground=[('active', '#ffffff')])
-    
-    # Danger button
-    style.configure("Danger.TButton",
-                   foreground="#ffffff", 
-                   background="#e74c3c")
-    style.map("Danger.TButton",
-              background=[('active', '#c0392b')],
-              foreground=[('active', '#ffffff')])
+    apply_styles(style, BUTTON_STYLES)
     
     # Create test frame
     frame = ttk.Frame(root, padding="20")
@@ -107,7 +107,7 @@ def test_button_styles():
     print("🔍 Testing button visibility...")
     print("Check if all button text is clearly visible!")
     
-    root.mainloop()
+    run_tk_for(root, duration)
 
 if __name__ == "__main__":
-    test_button_styles()
\ No newline at end of file
+    test_button_styles(duration_from_argv())
\ No newline at end of file
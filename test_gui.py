@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Run the GUI test scripts in one process
+Each test gets its own Toplevel under a single hidden root, so Python and Tk start only once
+"""
+
+import tkinter as tk
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_utils import duration_from_argv
+from test_buttons import test_button_styles
+from test_ui import test_ui_enhancements
+
+def run_gui_tests(duration):
+    """Run every GUI test against one shared Tk root"""
+    root = tk.Tk()
+    root.withdraw()
+    
+    tests = [test_button_styles, test_ui_enhancements]
+    try:
+        from test_responsive import test_responsive_window
+        tests.append(test_responsive_window)
+    except ImportError as e:
+        print(f"⚠️  Skipping responsive window test: {e}")
+        
+    for test in tests:
+        print(f"\n📋 {test.__name__}")
+        test(duration, parent=root)
+        
+    root.destroy()
+    print("\n✅ GUI tests completed!")
+
+if __name__ == "__main__":
+    run_gui_tests(duration_from_argv(2))
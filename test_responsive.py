@@ -10,12 +10,13 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from app import OANA
+    from test_utils import run_tk_for, duration_from_argv
     
-    def test_responsive_window():
+    def test_responsive_window(duration=2, parent=None):
         """Test the responsive window functionality"""
         print("Testing responsive window setup...")
         
-        root = tk.Tk()
+        root = tk.Toplevel(parent) if parent is not None else tk.Tk()
         app = OANA(root)
         
         # Test responsive setup
@@ -26,15 +27,13 @@ try:
         print(f"Minimum size: {root.minsize()}")
         
         # Show window briefly
-        root.update()
-        root.after(2000, root.destroy)  # Close after 2 seconds
-        root.mainloop()
+        run_tk_for(root, duration)
         
         print("Responsive window test completed!")
         return True
         
     if __name__ == "__main__":
-        test_responsive_window()
+        test_responsive_window(duration_from_argv(2))
         
 except Exception as e:
     print(f"Error testing responsive window: {e}")
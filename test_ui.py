@@ -5,35 +5,48 @@ Tests the enhanced UI components and styling
 """
 
 import tkinter as tk
+import tkinter.font as tkfont
+from functools import partial
 from tkinter import ttk
 import sys
 import os
 
+from test_utils import run_tk_for, duration_from_argv
+
 # Add the project directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-def test_ui_enhancements():
-    """Test the enhanced UI components"""
-    root = tk.Tk()
+# Test modern theme
+THEMES = {
+    "light": {
+        "bg": "#ffffff",
+        "fg": "#2c3e50",
+        "accent": "#3498db",
+        "panel_bg": "#ecf0f1",
+        "entry_bg": "#f8f9fa",
+        "button_bg": "#3498db",
+        "button_fg": "#ffffff"
+    }
+}
+
+def test_ui_enhancements(duration=None, parent=None):
+    """Test the enhanced UI components; closes itself after `duration` seconds if given"""
+    root = tk.Toplevel(parent) if parent is not None else tk.Tk()
     root.title("OANA UI Test")
     root.geometry("600x400")
     
-    # Test modern theme
-    themes = {
-        "light": {
-            "bg": "#ffffff",
-            "fg": "#2c3e50",
-            "accent": "#3498db",
-            "panel_bg": "#ecf0f1",
-            "entry_bg": "#f8f9fa",
-            "button_bg": "#3498db",
-            "button_fg": "#ffffff"
-        }
-    }
-    
-    theme = themes["light"]
+    theme = THEMES["light"]
     root.configure(bg=theme["bg"])
     
+    # Named fonts are resolved by Tk once instead of re-parsing a tuple per widget
+    title_font = tkfont.Font(root=root, family="Segoe UI", size=16, weight="bold")
+    heading_font = tkfont.Font(root=root, family="Segoe UI", size=11, weight="bold")
+    body_font = tkfont.Font(root=root, family="Segoe UI", size=11)
+    text_font = tkfont.Font(root=root, family="Segoe UI", size=10)
+    small_font = tkfont.Font(root=root, family="Segoe UI", size=9)
+    
+    section_label = partial(tk.Label, font=heading_font, bg=theme["bg"], fg=theme["fg"])
+    
     # Test title bar
     title_frame = tk.Frame(root, bg=theme["accent"], height=60)
     title_frame.pack(fill=tk.X)
@@ -41,14 +54,14 @@ def test_ui_enhancements():
     
     title_label = tk.Label(title_frame, 
                           text="🧠 OANA - UI Test", 
-                          font=("Segoe UI", 16, "bold"), 
+                          font=title_font, 
                           fg="white", 
                           bg=theme["accent"])
     title_label.pack(side=tk.LEFT, padx=20, pady=15)
     
     status_label = tk.Label(title_frame, 
                            text="✅ UI Test Running", 
-                           font=("Segoe UI", 10), 
+                           font=text_font, 
                            fg="white", 
                            bg=theme["accent"])
     status_label.pack(side=tk.RIGHT, padx=20, pady=15)
@@ -61,12 +74,10 @@ def test_ui_enhancements():
     entry_frame = tk.Frame(main_frame, bg=theme["bg"])
     entry_frame.pack(fill=tk.X, pady=(0, 10))
     
-    tk.Label(entry_frame, text="Modern Input:", 
-             font=("Segoe UI", 11, "bold"), 
-             bg=theme["bg"], fg=theme["fg"]).pack(anchor=tk.W)
+    section_label(entry_frame, text="Modern Input:").pack(anchor=tk.W)
     
     test_entry = tk.Entry(entry_frame,
-                         font=("Segoe UI", 11),
+                         font=body_font,
                          bg=theme["entry_bg"],
                          fg=theme["fg"],
                          relief=tk.FLAT,
@@ -78,20 +89,18 @@ def test_ui_enhancements():
     button_frame = tk.Frame(main_frame, bg=theme["bg"])
     button_frame.pack(fill=tk.X, pady=10)
     
-    tk.Label(button_frame, text="Modern Buttons:", 
-             font=("Segoe UI", 11, "bold"), 
-             bg=theme["bg"], fg=theme["fg"]).pack(anchor=tk.W, pady=(0, 5))
+    section_label(button_frame, text="Modern Buttons:").pack(anchor=tk.W, pady=(0, 5))
     
     # Create modern-style buttons
     btn1 = tk.Button(button_frame, text="📁 Primary Action",
-                     font=("Segoe UI", 9),
+                     font=small_font,
                      bg=theme["button_bg"], fg=theme["button_fg"],
                      relief=tk.FLAT, borderwidth=0,
                      padx=15, pady=8)
     btn1.pack(side=tk.LEFT, padx=(0, 10))
     
     btn2 = tk.Button(button_frame, text="⚙️ Secondary Action",
-                     font=("Segoe UI", 9),
+                     font=small_font,
                      bg=theme["panel_bg"], fg=theme["fg"],
                      relief=tk.FLAT, borderwidth=1,
                      padx=15, pady=8)
@@ -101,12 +110,10 @@ def test_ui_enhancements():
     text_frame = tk.Frame(main_frame, bg=theme["bg"])
     text_frame.pack(fill=tk.BOTH, expand=True, pady=10)
     
-    tk.Label(text_frame, text="Modern Text Area:", 
-             font=("Segoe UI", 11, "bold"), 
-             bg=theme["bg"], fg=theme["fg"]).pack(anchor=tk.W, pady=(0, 5))
+    section_label(text_frame, text="Modern Text Area:").pack(anchor=tk.W, pady=(0, 5))
     
     test_text = tk.Text(text_frame,
-                       font=("Segoe UI", 10),
+                       font=text_font,
                        bg=theme["entry_bg"],
                        fg=theme["fg"],
                        relief=tk.FLAT,
@@ -131,13 +138,13 @@ The new design should provide a more professional and pleasant user experience w
     
     status_msg = tk.Label(status_frame, 
                          text="✨ UI enhancements loaded successfully", 
-                         font=("Segoe UI", 9), 
+                         font=small_font, 
                          bg=theme["panel_bg"], fg=theme["fg"])
     status_msg.pack(pady=5)
     
-    root.mainloop()
+    run_tk_for(root, duration)
 
 if __name__ == "__main__":
     print("🚀 Testing OANA UI enhancements...")
-    test_ui_enhancements()
+    test_ui_enhancements(duration_from_argv())
     print("✅ UI test completed!")
\ No newline at end of file
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the manual GUI test scripts
+"""
+
+import sys
+import time
+import tkinter as tk
+
+def run_tk_for(root, seconds=None):
+    """Run root's event loop, for at most `seconds` when given, then destroy it"""
+    if seconds is None:
+        root.mainloop()
+        return
+        
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            root.update()
+            time.sleep(0.01)
+        root.destroy()
+    except tk.TclError:
+        pass  # Window was already closed
+
+def duration_from_argv(default=None):
+    """Seconds to keep a test window open, taken from the first command-line argument"""
+    if len(sys.argv) > 1:
+        try:
+            return float(sys.argv[1])
+        except ValueError:
+            print(f"Ignoring invalid duration: {sys.argv[1]}")
+    return default
@@ -4,32 +4,172 @@ Supports multiple backends: llama-cpp-python, Ollama, transformers
 """
 
 import os
+import re
+import sys
+import copy
 import json
-from typing import Optional, List, Dict
+import functools
+import ctypes
+import ctypes.util
+import platform
+import queue
+import threading
+import time
+from pathlib import Path
+import importlib.util
+from typing import Optional, List, Dict, Iterator
 
-# Try different AI backends
-LLAMA_CPP_AVAILABLE = False
-OLLAMA_AVAILABLE = False
-TRANSFORMERS_AVAILABLE = False
 
-try:
-    from llama_cpp import Llama
-    LLAMA_CPP_AVAILABLE = True
-except ImportError:
-    pass
+# Keyword routing for fallback replies, matched in a single pass over the prompt
+FALLBACK_KEYWORDS = re.compile(
+    r"\b(?:(?P<help>setup|install|help|how)|(?P<hello>hello|hi)|(?P<model>models?))\b",
+    re.IGNORECASE
+)
 
-try:
-    import ollama
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    pass
+# Reply prefix for each keyword group, checked in priority order
+FALLBACK_PREFIXES = (
+    ("help", ""),
+    ("hello", "Hello! "),
+    ("model", "Model not loaded. "),
+)
+FALLBACK_DEFAULT_PREFIX = "I'm in fallback mode and cannot provide AI responses. "
+
+FALLBACK_INSTRUCTIONS = """
+🚫 OANA is running in FALLBACK MODE
+
+To enable full AI functionality, you need to:
+
+1. Install AI backend:
+   pip install llama-cpp-python
+
+2. Download a model:
+   python download_models.py
+
+3. Or manually place a .gguf model file in the 'models/' folder
+
+Available backends status:
+"""
+
+
+def _module_available(name):
+    """Check whether a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Backend libraries can take seconds to import, so they are only located here
+# and imported when their backend is initialized
+OLLAMA_AVAILABLE = _module_available("ollama")
+LLAMA_CPP_AVAILABLE = _module_available("llama_cpp")
+TRANSFORMERS_AVAILABLE = _module_available("transformers") and _module_available("torch")
+
+# Loaded Llama instances keyed by (model file, mtime, constructor options), so a
+# reload of the same GGUF reuses the mapped weights instead of parsing them again
+_LLAMA_CACHE = {}
+
+# Default memory budget in MB for llama.cpp's saved prompt states (prefix KV
+# cache); ai_settings.llama_state_cache_mb in config.json overrides it, 0 disables it
+LLAMA_STATE_CACHE_MB = 256
+
+# A Llama context is not thread safe and the cached instance is shared between
+# engines, so generation on it is serialized
+_LLAMA_LOCK = threading.Lock()
+
+# Stop sequences for llama.cpp replies: the next turn of the transcript, or the
+# blank line that ends a single chat answer
+LLAMA_STOP_SEQUENCES = ["User:", "Human:", "\n\n"]
+
+# Concurrent transformers prompts are packed into one batch of up to this many,
+# waiting at most this long (seconds) for more prompts to arrive
+TRANSFORMERS_MAX_BATCH = 8
+TRANSFORMERS_BATCH_WINDOW = 0.01
+
+# Rough size of a token for backends without a local tokenizer (Ollama, fallback)
+CHARS_PER_TOKEN = 4
+
+# Preferred GGUF quantizations, best first. CPU decoding is memory-bandwidth
+# bound, so 4-5 bit K-quants are much faster than Q8_0/F16 at similar quality
+QUANT_PREFERENCE = ("Q4_K_M", "Q5_K_M", "Q4_0", "Q8_0", "F16")
+QUANT_PATTERN = re.compile(r"[.\-_](Q\d_K_[SML]|Q\d_K|Q\d_\d|BF16|F16|F32)\.gguf$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_config(path, mtime_ns):
+    """Parse a config file; cached per path and modification time"""
+    return json.loads(Path(path).read_bytes())
 
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    pass
+
+@functools.lru_cache(maxsize=8)
+def _scan_gguf_cached(directory, mtime_ns):
+    """List (name, size) of GGUF files in a directory; cached per directory version"""
+    with os.scandir(directory) as entries:
+        return tuple(
+            (entry.name, entry.stat().st_size)
+            for entry in entries
+            if entry.name.endswith('.gguf') and entry.is_file()
+        )
+
+
+def _scan_gguf(directory):
+    """List (name, size) of GGUF files in a directory, or () if it is missing"""
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return ()
+    return _scan_gguf_cached(directory, mtime_ns)
+
+
+def _quant_rank(filename):
+    """Rank a GGUF file by its quantization tag (lower is preferred)"""
+    match = QUANT_PATTERN.search(filename)
+    tag = match.group(1).upper() if match else None
+    if tag in QUANT_PREFERENCE:
+        return QUANT_PREFERENCE.index(tag)
+    return len(QUANT_PREFERENCE)
+
+
+def _physical_core_count():
+    """Number of physical CPU cores, or None when it cannot be determined"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.cpu_count(logical=False)
+
+
+def _llama_thread_counts():
+    """Pick decode and prompt-eval thread counts for this machine"""
+    logical = os.cpu_count() or 4
+    # Decoding is memory bound and suffers from SMT contention, so use one thread
+    # per physical core when that count is known, but never fewer than the 4
+    # threads used before where the machine has them; prompt evaluation is
+    # compute bound and benefits from every logical core
+    physical = _physical_core_count() or logical
+    return max(min(physical, logical), min(4, logical)), logical
+
+
+def _gpu_offload_available():
+    """Check whether llama.cpp can offload layers to a GPU on this machine"""
+    try:
+        import llama_cpp
+        supports_offload = getattr(llama_cpp, "llama_supports_gpu_offload", None)
+        if supports_offload is not None:
+            return bool(supports_offload())
+    except Exception:
+        pass
+    
+    # Older llama-cpp-python builds: Apple Silicon always has Metal, otherwise
+    # look for the CUDA driver library
+    if sys.platform == "darwin":
+        return platform.machine() == "arm64"
+    library = "nvcuda.dll" if sys.platform == "win32" else (ctypes.util.find_library("cuda") or "libcuda.so.1")
+    try:
+        ctypes.CDLL(library)
+        return True
+    except OSError:
+        return False
 
 
 class AIEngine:
@@ -37,8 +177,16 @@ class AIEngine:
         self.model = None
         self.backend = None
         self.model_path = model_path
+        self.model_name = "Unknown"
+        self.models_dir = None
         self.is_loaded = False
+        self._fallback_message = None
+        self._batch_queue = None
+        self._ollama_key = None
+        self._ollama_context = None
+        self._ollama_models = set()
         self.config = self._load_config()
+        self._prepare_prompt_templates()
         
         # Initialize with best available backend
         if backend == "auto":
@@ -60,14 +208,23 @@ class AIEngine:
         
         try:
             if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    # Merge with defaults
-                    default_config.update(config)
+                config = _read_config(config_path, os.stat(config_path).st_mtime_ns)
+                if not isinstance(config, dict):
+                    raise ValueError("top level is not a JSON object")
+                # Merge a copy with defaults so callers cannot mutate the cached dict
+                default_config.update(copy.deepcopy(config))
             return default_config
-        except:
+        except (OSError, ValueError) as e:
+            # ValueError covers JSONDecodeError and UnicodeDecodeError
+            print(f"Failed to load config from {config_path}: {e}")
             return default_config
             
+    def _prepare_prompt_templates(self):
+        """Precompute the prompt prefixes derived from the system prompt"""
+        system_prompt = self.config.get("system_prompt", "You are a helpful assistant.")
+        self._prompt_prefix = system_prompt + "\n\nUser: "
+        self._context_prefix = system_prompt + "\n\nContext:\n"
+        
     def _auto_detect_backend(self):
         """Auto-detect best available backend"""
         # Check for local GGUF models in multiple possible locations
@@ -81,13 +238,12 @@ class AIEngine:
         self.models_dir = None
         
         for models_dir in possible_model_dirs:
-            if os.path.exists(models_dir):
-                found_files = [f for f in os.listdir(models_dir) if f.endswith('.gguf')]
-                if found_files:
-                    gguf_files = found_files
-                    self.models_dir = models_dir
-                    print(f"Found {len(gguf_files)} GGUF model(s) in {models_dir}")
-                    break
+            found_files = _scan_gguf(models_dir)
+            if found_files:
+                gguf_files = found_files
+                self.models_dir = models_dir
+                print(f"Found {len(gguf_files)} GGUF model(s) in {models_dir}")
+                break
         
         if not gguf_files:
             print("No GGUF models found in any of the following locations:")
@@ -128,12 +284,13 @@ class AIEngine:
         """Initialize llama-cpp-python backend"""
         if not LLAMA_CPP_AVAILABLE:
             raise Exception("llama-cpp-python not available. Install with: pip install llama-cpp-python")
+        from llama_cpp import Llama, LlamaRAMCache
             
         # Use the models directory found during auto-detection
         if not self.models_dir or not os.path.exists(self.models_dir):
             raise Exception("No models directory found. Please create a 'models' folder and add GGUF model files.")
             
-        model_files = [f for f in os.listdir(self.models_dir) if f.endswith('.gguf')]
+        model_files = _scan_gguf(self.models_dir)
             
         if not model_files:
             raise Exception(f"No GGUF model files found in {self.models_dir}. Please download models using 'python download_models.py'")
@@ -143,28 +300,56 @@ class AIEngine:
             model_path = self.model_path
             model_name = os.path.basename(model_path)
         else:
-            # Sort models by size (smaller models load faster)
-            model_files_with_size = []
-            for f in model_files:
-                full_path = os.path.join(self.models_dir, f)
-                size = os.path.getsize(full_path)
-                model_files_with_size.append((f, size))
-            
-            # Sort by size and use the smallest for faster loading
-            model_files_with_size.sort(key=lambda x: x[1])
-            model_name = model_files_with_size[0][0]
+            # Prefer the best quantization, then the smallest file for faster loading
+            model_name = min(model_files, key=lambda f: (_quant_rank(f[0]), f[1], f[0]))[0]
             model_path = os.path.join(self.models_dir, model_name)
         
         print(f"Loading model: {model_name}")
         print(f"Model path: {model_path}")
         
+        n_threads, n_threads_batch = _llama_thread_counts()
+        use_gpu = _gpu_offload_available()
+        if use_gpu:
+            print("GPU detected, offloading all layers")
+        llama_options = {
+            "n_ctx": 4096,  # Context length
+            "n_threads": n_threads,  # CPU threads used while generating
+            "n_batch": 512,  # Prompt tokens evaluated per batch
+            "use_mmap": True,  # Map weights so the OS page cache can share them
+            "use_mlock": False,
+            "n_gpu_layers": -1 if use_gpu else 0,  # -1 offloads every layer
+            "main_gpu": 0,
+            "tensor_split": None,
+            "logits_all": False,  # Only the last token's logits are needed
+            "verbose": False
+        }
+        # Options only recent llama-cpp-python releases understand
+        newer_options = {
+            "n_threads_batch": n_threads_batch,  # CPU threads used for prompt evaluation
+            "flash_attn": True,  # Fused attention kernel, less KV cache traffic
+            "offload_kqv": True,  # Keep the KV cache on the GPU with the layers
+        }
+        
         try:
-            self.model = Llama(
-                model_path=model_path,
-                n_ctx=2048,  # Context length
-                n_threads=4,  # Number of CPU threads
-                verbose=False
-            )
+            real_path = os.path.realpath(model_path)
+            options_key = tuple(sorted(llama_options.items())) + tuple(sorted(newer_options.items()))
+            cache_key = (real_path, os.stat(real_path).st_mtime_ns, options_key)
+            if cache_key in _LLAMA_CACHE:
+                print("Reusing already loaded model")
+            else:
+                # Only one model stays resident; drop the old one before loading another
+                _LLAMA_CACHE.clear()
+                try:
+                    model = Llama(model_path=model_path, **llama_options, **newer_options)
+                except TypeError:
+                    model = Llama(model_path=model_path, **llama_options)
+                # Keep KV states of earlier prompts so a repeated system prompt and
+                # document context are not evaluated again on every turn
+                state_cache_mb = self.config.get("ai_settings", {}).get("llama_state_cache_mb", LLAMA_STATE_CACHE_MB)
+                if state_cache_mb:
+                    model.set_cache(LlamaRAMCache(capacity_bytes=int(state_cache_mb) << 20))
+                _LLAMA_CACHE[cache_key] = model
+            self.model = _LLAMA_CACHE[cache_key]
             
             self.is_loaded = True
             self.model_name = model_name
@@ -180,12 +365,14 @@ class AIEngine:
             
         # Check if Ollama is running and has models
         try:
+            import ollama
             models = ollama.list()
             if not models.get('models'):
                 raise Exception("No Ollama models available. Install with: ollama pull llama2")
                 
-            # Use first available model
+            # Use first available model; the others can still be requested per prompt
             self.model_name = models['models'][0]['name']
+            self._ollama_models = {model.get('name') for model in models['models']}
             self.model = ollama
             self.is_loaded = True
             print(f"Ollama backend initialized with {self.model_name}")
@@ -199,148 +386,316 @@ class AIEngine:
             raise Exception("Transformers not available")
             
         try:
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            import torch
+            
             # Use a small, fast model
             model_name = "microsoft/DialoGPT-small"
             print(f"Loading transformers model: {model_name}")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = pipeline(
-                "text-generation",
-                model=model_name,
-                tokenizer=self.tokenizer,
-                device=0 if torch.cuda.is_available() else -1
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+            # Keep the end of long prompts, where the user's question is, and pad
+            # batches on the left so every prompt ends right before its reply
+            self.tokenizer.truncation_side = "left"
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            
+            self.model = self._load_transformers_model(AutoModelForCausalLM, model_name, torch).eval()
+            # Tokenizers without a limit report a huge sentinel, so also bound by the model
+            self.context_window = min(
+                self.tokenizer.model_max_length,
+                getattr(self.model.config, "max_position_embeddings", self.tokenizer.model_max_length)
             )
             
+            # Page-locked staging buffers let prompt tokens reach the GPU without a
+            # synchronous host copy; the CPU path uses the tokenizer's tensors directly
+            self._pinned_ids = None
+            self._pinned_mask = None
+            if self.device == "cuda":
+                buffer_shape = (TRANSFORMERS_MAX_BATCH, self.context_window)
+                self._pinned_ids = torch.empty(buffer_shape, dtype=torch.long, pin_memory=True)
+                self._pinned_mask = torch.empty(buffer_shape, dtype=torch.long, pin_memory=True)
+            
+            # One batching thread per engine; it always uses the current model
+            if self._batch_queue is None:
+                self._batch_queue = queue.SimpleQueue()
+                threading.Thread(target=self._batch_loop, daemon=True).start()
+            
             self.is_loaded = True
             print("Transformers backend initialized")
             
         except Exception as e:
             raise Exception(f"Transformers initialization failed: {e}")
             
+    def _load_transformers_model(self, model_class, model_name, torch):
+        """Load the model at the smallest precision this machine supports"""
+        attempts = []
+        if self.device == "cuda":
+            if _module_available("bitsandbytes"):
+                from transformers import BitsAndBytesConfig
+                attempts.append(("4-bit NF4", {"quantization_config": BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=torch.float16
+                )}))
+                attempts.append(("8-bit", {"quantization_config": BitsAndBytesConfig(load_in_8bit=True)}))
+            attempts.append(("fp16", {"torch_dtype": torch.float16}))
+        # bitsandbytes and fp16 matmuls need a GPU; CPUs run fastest at fp32
+        attempts.append(("fp32", {"torch_dtype": torch.float32}))
+        
+        last_error = None
+        for label, options in attempts:
+            try:
+                try:
+                    model = model_class.from_pretrained(model_name, attn_implementation="sdpa", **options)
+                except (TypeError, ValueError):
+                    # Older transformers releases or models without SDPA support
+                    model = model_class.from_pretrained(model_name, **options)
+            except Exception as e:
+                print(f"Could not load {label} weights: {e}")
+                last_error = e
+                continue
+                
+            print(f"Loaded {label} weights")
+            # Quantized models are placed on the GPU by bitsandbytes itself
+            if "quantization_config" in options:
+                return model
+            return model.to(self.device)
+            
+        raise last_error
+        
     def _init_fallback(self):
         """Initialize fallback mock backend for testing"""
         self.model = "fallback"
         self.backend = "fallback"
         self.is_loaded = True
+        self._fallback_message = self._compose_fallback_status()
         print("Fallback backend initialized (mock responses)")
         
     def is_ready(self):
         """Check if AI engine is ready"""
         return self.is_loaded
         
-    def generate_response(self, prompt: str, context: str = "") -> str:
+    def generate_response(self, prompt: str, context: str = "", model: Optional[str] = None,
+                          max_tokens: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
         """Generate AI response"""
+        return "".join(self.generate_response_stream(prompt, context, model, max_tokens, stop)).strip()
+        
+    def generate_response_stream(self, prompt: str, context: str = "", model: Optional[str] = None,
+                                 max_tokens: Optional[int] = None, stop: Optional[List[str]] = None,
+                                 cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Generate AI response, yielding text as the backend produces it
+        
+        model is a hint: Ollama serves it for this prompt if it is installed,
+        otherwise (and on the other backends) the loaded model answers.
+        max_tokens overrides the configured reply length; stop replaces the
+        llama.cpp stop sequences and is passed to Ollama (transformers ignores it).
+        Setting cancel ends a llama.cpp or Ollama stream at the next token, which
+        also frees the shared llama.cpp model for other requests.
+        """
         if not self.is_loaded:
-            return "AI engine not ready. Please check model installation."
+            yield "AI engine not ready. Please check model installation."
+            return
             
         try:
             # Combine context and prompt
             full_prompt = self._build_full_prompt(prompt, context)
+            if max_tokens is None:
+                max_tokens = self.config.get("max_tokens", 512)
             
             if self.backend == "llama-cpp":
-                return self._generate_llama_cpp(full_prompt)
+                chunks = self._generate_llama_cpp(full_prompt, max_tokens, stop, cancel)
             elif self.backend == "ollama":
-                return self._generate_ollama(full_prompt)
+                chunks = self._generate_ollama(full_prompt, prompt, context, model, max_tokens, stop, cancel)
             elif self.backend == "transformers":
-                return self._generate_transformers(full_prompt)
+                chunks = iter([self._generate_transformers(full_prompt, max_tokens)])
             else:
-                return self._generate_fallback(full_prompt)
+                chunks = iter([self._generate_fallback(full_prompt)])
+                
+            # Drop leading whitespace the way the non-streaming response was stripped
+            for chunk in chunks:
+                chunk = chunk.lstrip()
+                if chunk:
+                    yield chunk
+                    break
+            yield from chunks
                 
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            yield f"Error generating response: {str(e)}"
             
     def _build_full_prompt(self, prompt: str, context: str = "") -> str:
         """Build full prompt with system message and context"""
-        system_prompt = self.config.get("system_prompt", "You are a helpful assistant.")
-        
+        # The system prompt and context come first and the user turn last, so
+        # consecutive prompts share a prefix the llama.cpp state cache can reuse
         if context:
-            full_prompt = f"{system_prompt}\n\nContext:\n{context}\n\nUser: {prompt}\n\nAssistant:"
-        else:
-            full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
-            
-        return full_prompt
+            return "".join((self._context_prefix, context, "\n\nUser: ", prompt, "\n\nAssistant:"))
+        return "".join((self._prompt_prefix, prompt, "\n\nAssistant:"))
         
-    def _generate_llama_cpp(self, prompt: str) -> str:
-        """Generate response using llama-cpp"""
+    def _generate_llama_cpp(self, prompt: str, max_tokens: int, stop: Optional[List[str]] = None,
+                            cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Stream response tokens using llama-cpp"""
         try:
-            response = self.model(
-                prompt,
-                max_tokens=self.config.get("max_tokens", 512),
-                temperature=self.config.get("temperature", 0.7),
-                top_p=self.config.get("top_p", 0.9),
-                top_k=self.config.get("top_k", 40),
-                repeat_penalty=self.config.get("repeat_penalty", 1.1),
-                stop=["User:", "Human:", "\n\n"],
-            )
-            
-            return response['choices'][0]['text'].strip()
+            with _LLAMA_LOCK:
+                # A request cancelled while waiting for the model skips its prompt evaluation
+                if cancel is not None and cancel.is_set():
+                    return
+                stream = self.model(
+                    prompt,
+                    max_tokens=max_tokens,
+                    temperature=self.config.get("temperature", 0.7),
+                    top_p=self.config.get("top_p", 0.9),
+                    top_k=self.config.get("top_k", 40),
+                    repeat_penalty=self.config.get("repeat_penalty", 1.1),
+                    stop=LLAMA_STOP_SEQUENCES if stop is None else stop,
+                    stream=True,
+                )
+                
+                for chunk in stream:
+                    # Stop generating, and release the lock, once the caller gives up
+                    if cancel is not None and cancel.is_set():
+                        break
+                    yield chunk['choices'][0]['text']
             
         except Exception as e:
-            return f"Error with llama-cpp generation: {str(e)}"
+            yield f"Error with llama-cpp generation: {str(e)}"
             
-    def _generate_ollama(self, prompt: str) -> str:
-        """Generate response using Ollama"""
+    def _generate_ollama(self, full_prompt: str, prompt: str, context: str = "", model: Optional[str] = None,
+                         max_tokens: int = 512, stop: Optional[List[str]] = None,
+                         cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Stream response tokens using Ollama"""
         try:
-            response = ollama.generate(
-                model=self.model_name,
-                prompt=prompt,
-                options={
-                    'temperature': self.config.get("temperature", 0.7),
-                    'top_p': self.config.get("top_p", 0.9),
-                    'top_k': self.config.get("top_k", 40),
-                    'num_predict': self.config.get("max_tokens", 512)
-                }
+            model_name = model if model in self._ollama_models else self.model_name
+            
+            # Follow-up questions about the same (non-empty) context continue the
+            # previous conversation, so Ollama only evaluates the new turn
+            conversation_key = (model_name, context)
+            if context and self._ollama_context and conversation_key == self._ollama_key:
+                request_prompt = "\n\nUser: " + prompt + "\n\nAssistant:"
+                request_context = self._ollama_context
+            else:
+                request_prompt = full_prompt
+                request_context = None
+            self.reset_conversation()
+            
+            options = {
+                'temperature': self.config.get("temperature", 0.7),
+                'top_p': self.config.get("top_p", 0.9),
+                'top_k': self.config.get("top_k", 40),
+                'num_predict': max_tokens,
+                'num_ctx': 4096
+            }
+            if stop:
+                options['stop'] = stop
+            stream = self.model.generate(
+                model=model_name,
+                prompt=request_prompt,
+                context=request_context,
+                options=options,
+                stream=True
             )
             
-            return response['response'].strip()
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    break
+                yield chunk['response']
+                if chunk.get('done') and chunk.get('context'):
+                    self._ollama_key = conversation_key
+                    self._ollama_context = chunk['context']
             
         except Exception as e:
-            return f"Error with Ollama generation: {str(e)}"
+            yield f"Error with Ollama generation: {str(e)}"
             
-    def _generate_transformers(self, prompt: str) -> str:
+    def _generate_transformers(self, prompt: str, max_tokens: int) -> str:
         """Generate response using Transformers"""
-        try:
-            # Truncate prompt if too long
-            max_input_length = 512
-            if len(prompt) > max_input_length:
-                prompt = prompt[-max_input_length:]
+        # Concurrent prompts are coalesced into one padded batch by _batch_loop
+        request = [prompt, max_tokens, threading.Event(), None]
+        self._batch_queue.put(request)
+        request[2].wait()
+        return request[3]
+        
+    def _batch_loop(self):
+        """Collect queued transformers prompts and generate them in batches"""
+        while True:
+            batch = [self._batch_queue.get()]
+            deadline = time.monotonic() + TRANSFORMERS_BATCH_WINDOW
+            while len(batch) < TRANSFORMERS_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._batch_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                    
+            try:
+                # The batch generates as long as its longest allowed reply
+                max_new_tokens = max(request[1] for request in batch)
+                replies = self._generate_transformers_batch([request[0] for request in batch], max_new_tokens)
+            except Exception as e:
+                replies = [f"Error with Transformers generation: {str(e)}"] * len(batch)
                 
-            response = self.model(
-                prompt,
-                max_length=len(prompt) + self.config.get("max_tokens", 256),
+            for request, reply in zip(batch, replies):
+                request[3] = reply
+                request[2].set()
+                
+    def _generate_transformers_batch(self, prompts: List[str], max_new_tokens: int) -> List[str]:
+        """Generate responses for several prompts with one padded model.generate call"""
+        # Tokenize once, keeping as much of each prompt as fits next to the reply
+        max_input_tokens = max(1, self.context_window - max_new_tokens)
+        encoded = self.tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=max_input_tokens)
+        input_ids, attention_mask = self._inputs_to_device(encoded["input_ids"], encoded["attention_mask"])
+        
+        import torch
+        with torch.inference_mode():
+            output_ids = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=max_new_tokens,
                 temperature=self.config.get("temperature", 0.7),
                 do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id
+                use_cache=True,
+                pad_token_id=self.tokenizer.pad_token_id
             )
-            
-            generated_text = response[0]['generated_text']
-            # Remove the input prompt from response
-            response_text = generated_text[len(prompt):].strip()
-            
-            return response_text if response_text else "I understand your question, but I need more context to provide a helpful response."
-            
-        except Exception as e:
-            return f"Error with Transformers generation: {str(e)}"
-            
+        
+        # Prompts are left-padded to a common length; decode only the new tokens
+        replies = []
+        for row in output_ids[:, input_ids.shape[1]:]:
+            response_text = self.tokenizer.decode(row, skip_special_tokens=True).strip()
+            replies.append(response_text if response_text else "I understand your question, but I need more context to provide a helpful response.")
+        return replies
+            
+    def _inputs_to_device(self, input_ids, attention_mask):
+        """Move prompt tensors to the model device, staging GPU copies through pinned memory"""
+        if self._pinned_ids is None:
+            return input_ids.to(self.device), attention_mask.to(self.device)
+            
+        rows, length = input_ids.shape
+        self._pinned_ids[:rows, :length].copy_(input_ids)
+        self._pinned_mask[:rows, :length].copy_(attention_mask)
+        return (
+            self._pinned_ids[:rows, :length].to(self.device, non_blocking=True),
+            self._pinned_mask[:rows, :length].to(self.device, non_blocking=True)
+        )
+        
     def _generate_fallback(self, prompt: str) -> str:
         """Generate mock response for testing"""
-        # Provide helpful setup instructions
-        setup_instructions = """
-🚫 OANA is running in FALLBACK MODE
-
-To enable full AI functionality, you need to:
-
-1. Install AI backend:
-   pip install llama-cpp-python
-
-2. Download a model:
-   python download_models.py
-
-3. Or manually place a .gguf model file in the 'models/' folder
-
-Available backends status:
-"""
+        if self._fallback_message is None:
+            self._fallback_message = self._compose_fallback_status()
+        full_message = self._fallback_message
         
+        # Simple keyword-based responses for different queries
+        matched = {match.lastgroup for match in FALLBACK_KEYWORDS.finditer(prompt)}
+        
+        for group, prefix in FALLBACK_PREFIXES:
+            if group in matched:
+                return prefix + full_message
+        return FALLBACK_DEFAULT_PREFIX + full_message
+            
+    def _compose_fallback_status(self) -> str:
+        """Build the setup instructions and backend/model status shown in fallback mode"""
         backend_status = []
         backend_status.append(f"• llama-cpp-python: {'✅ Available' if LLAMA_CPP_AVAILABLE else '❌ Not installed'}")
         backend_status.append(f"• Ollama: {'✅ Available' if OLLAMA_AVAILABLE else '❌ Not installed'}")
@@ -348,8 +703,8 @@ Available backends status:
         
         # Check for models
         models_found = []
-        if hasattr(self, 'models_dir') and self.models_dir and os.path.exists(self.models_dir):
-            gguf_files = [f for f in os.listdir(self.models_dir) if f.endswith('.gguf')]
+        if self.models_dir and os.path.exists(self.models_dir):
+            gguf_files = _scan_gguf(self.models_dir)
             if gguf_files:
                 models_found.append(f"Found {len(gguf_files)} GGUF models in {self.models_dir}")
             else:
@@ -357,27 +712,15 @@ Available backends status:
         else:
             models_found.append("No models directory found")
         
-        full_message = setup_instructions + "\n".join(backend_status) + "\n\nModels status:\n" + "\n".join(models_found)
-        
-        # Simple keyword-based responses for different queries
-        prompt_lower = prompt.lower()
-        
-        if any(word in prompt_lower for word in ["setup", "install", "help", "how"]):
-            return full_message
-        elif "hello" in prompt_lower or "hi" in prompt_lower:
-            return "Hello! " + full_message
-        elif "model" in prompt_lower:
-            return "Model not loaded. " + full_message
-        else:
-            return "I'm in fallback mode and cannot provide AI responses. " + full_message
+        return FALLBACK_INSTRUCTIONS + "\n".join(backend_status) + "\n\nModels status:\n" + "\n".join(models_found)
             
     def get_model_info(self) -> Dict:
         """Get information about loaded model"""
         return {
             "backend": self.backend,
             "is_loaded": self.is_loaded,
-            "model_name": getattr(self, 'model_name', 'Unknown'),
-            "model_path": getattr(self, 'model_path', None),
+            "model_name": self.model_name,
+            "model_path": self.model_path,
             "available_backends": {
                 "llama-cpp": LLAMA_CPP_AVAILABLE,
                 "ollama": OLLAMA_AVAILABLE,
@@ -397,17 +740,13 @@ Available backends status:
         ]
         
         for models_dir in possible_model_dirs:
-            if os.path.exists(models_dir):
-                for file in os.listdir(models_dir):
-                    if file.endswith('.gguf'):
-                        full_path = os.path.join(models_dir, file)
-                        size_mb = os.path.getsize(full_path) / (1024 * 1024)
-                        models.append({
-                            "name": file,
-                            "path": full_path,
-                            "size_mb": round(size_mb, 2),
-                            "backend": "llama-cpp"
-                        })
+            for file, size in _scan_gguf(models_dir):
+                models.append({
+                    "name": file,
+                    "path": os.path.join(models_dir, file),
+                    "size_mb": round(size / (1024 * 1024), 2),
+                    "backend": "llama-cpp"
+                })
                         
         # Check for Ollama models
         if OLLAMA_AVAILABLE:
@@ -452,10 +791,37 @@ Available backends status:
             print(f"Failed to switch model: {e}")
             return False
         
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens of the loaded model's tokenizer"""
+        # No token is longer than this many characters in practice; cutting first
+        # keeps a large document from being tokenized in full
+        text = text[:max_tokens * 16]
+        
+        if self.backend == "llama-cpp" and self.model is not None:
+            tokens = self.model.tokenize(text.encode("utf-8"), add_bos=False)
+            if len(tokens) <= max_tokens:
+                return text
+            return self.model.detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+            
+        tokenizer = getattr(self, "tokenizer", None)
+        if self.backend == "transformers" and tokenizer is not None:
+            tokens = tokenizer.encode(text, add_special_tokens=False)
+            if len(tokens) <= max_tokens:
+                return text
+            return tokenizer.decode(tokens[:max_tokens], skip_special_tokens=True)
+            
+        return text[:max_tokens * CHARS_PER_TOKEN]
+        
+    def reset_conversation(self):
+        """Forget the Ollama conversation state so the next prompt starts fresh"""
+        self._ollama_key = None
+        self._ollama_context = None
+        
     def reload_model(self, model_path=None):
         """Reload model with new path"""
         self.is_loaded = False
         self.model = None
+        self._fallback_message = None
         
         if model_path:
             self.model_path = model_path
@@ -6,22 +6,111 @@ Handles SQLite database operations for chat history and document storage
 import sqlite3
 import json
 import os
+import atexit
+import threading
+import zlib
 from datetime import datetime
 from typing import List, Dict, Optional
 
+# Chat messages are buffered and written together once this many are queued,
+# or this many seconds after the first one, whichever comes first
+CHAT_FLUSH_THRESHOLD = 64
+CHAT_FLUSH_INTERVAL = 1.0
+
+# SQLite expressions for the current local time, in the same formats the
+# Python side writes (datetime.isoformat() and "%Y-%m-%d %H:%M:%S"); plain
+# CURRENT_TIMESTAMP is UTC and would sort wrongly against those values
+SQL_NOW_ISO = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+SQL_NOW_SECONDS = "strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')"
+
+# Statements on the chat hot path, shared so each is prepared once and then
+# served from the connection's statement cache
+SQL_ENSURE_SESSION = '''
+    INSERT OR IGNORE INTO chat_sessions (session_id, title, updated_at)
+    VALUES (?, ?, ?)
+'''
+SQL_INSERT_MESSAGE = '''
+    INSERT INTO chat_history (session_id, role, message, timestamp)
+    VALUES (?, ?, ?, ?)
+'''
+SQL_TOUCH_SESSION = '''
+    UPDATE chat_sessions 
+    SET updated_at = ?, message_count = message_count + ?
+    WHERE session_id = ?
+'''
+SQL_GET_HISTORY = '''
+    SELECT timestamp, role, message FROM (
+        SELECT timestamp, role, message FROM chat_history
+        WHERE session_id = ?
+        ORDER BY timestamp DESC
+        LIMIT ?
+    )
+    ORDER BY timestamp ASC
+'''
+SQL_GET_CHAT_SESSIONS = '''
+    SELECT session_id, title, summary, created_at, updated_at, message_count
+    FROM chat_sessions
+    WHERE is_active = 1
+    ORDER BY updated_at DESC
+    LIMIT ?
+'''
+
+# Applied to every connection: WAL-friendly durability (one fsync per checkpoint
+# instead of two per commit), in-memory temp tables, a 64 MB page cache, a 256 MB
+# memory map, and waiting for a busy writer instead of failing
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=30000;
+"""
+
+
+def _compress_text(text: str) -> bytes:
+    """Compress document text for storage"""
+    return zlib.compress(text.encode('utf-8'))
+
+
+def _decompress_text(blob: Optional[bytes]) -> str:
+    """Restore document text stored by _compress_text"""
+    return zlib.decompress(blob).decode('utf-8') if blob else ""
+
+
 class OANADatabase:
     """SQLite database handler for OANA application"""
     
     def __init__(self, db_path: str = "oana.db"):
         """Initialize database connection and create tables"""
         self.db_path = db_path
+        # One connection for the app's lifetime keeps SQLite's page and statement
+        # caches warm; the lock serializes use from the UI and worker threads
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._pending_messages = []
+        self._flush_timer = None
         self.init_database()
+        # The flush timer is a daemon thread; write whatever is still queued if
+        # the process exits without reaching close()
+        atexit.register(self.flush)
+        
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the performance pragmas applied"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.executescript(CONNECTION_PRAGMAS)
+        # Rows expose columns by name, so results map straight onto dicts
+        conn.row_factory = sqlite3.Row
+        return conn
         
     def init_database(self):
         """Initialize database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
+            # WAL is stored in the database file, so setting it once is enough; it
+            # lets readers run while a message is being written
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Create chat_sessions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS chat_sessions (
@@ -31,10 +120,23 @@ class OANADatabase:
                     summary TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1
+                    is_active BOOLEAN DEFAULT 1,
+                    message_count INTEGER DEFAULT 0
                 )
             ''')
             
+            # Older databases lack the denormalized message count; add and backfill it once
+            cursor.execute('PRAGMA table_info(chat_sessions)')
+            if 'message_count' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE chat_sessions ADD COLUMN message_count INTEGER DEFAULT 0')
+                cursor.execute('''
+                    UPDATE chat_sessions SET message_count = COALESCE((
+                        SELECT c FROM (
+                            SELECT session_id, COUNT(*) AS c FROM chat_history GROUP BY session_id
+                        ) m WHERE m.session_id = chat_sessions.session_id
+                    ), 0)
+                ''')
+            
             # Create chat_history table (updated with session reference)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS chat_history (
@@ -62,6 +164,25 @@ class OANADatabase:
                 )
             ''')
             
+            # Document text lives in its own table, compressed, so listing documents
+            # only reads small metadata rows; documents.content is left empty
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS document_contents (
+                    doc_id INTEGER PRIMARY KEY,
+                    content BLOB NOT NULL
+                )
+            ''')
+            
+            # Move text stored inline by older versions into the side table
+            cursor.execute("SELECT id, content FROM documents WHERE content != ''")
+            inline_documents = cursor.fetchall()
+            if inline_documents:
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO document_contents (doc_id, content) VALUES (?, ?)',
+                    [(document_id, _compress_text(content)) for document_id, content in inline_documents]
+                )
+                cursor.execute("UPDATE documents SET content = '' WHERE content != ''")
+            
             # Create sessions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS sessions (
@@ -82,86 +203,116 @@ class OANADatabase:
                 )
             ''')
             
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_session ON chat_history(session_id)')
+            # Create indexes for better performance; the composite indexes match each
+            # hot query's filter and ORDER BY, so SQLite walks them instead of sorting
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_session_ts ON chat_history(session_id, timestamp DESC)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_history(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_active ON documents(is_active)')
+            # Partial index over live documents only: soft-deleted rows never enter it.
+            # Queries must spell the filter as the literal is_active = 1 to use it
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_live_time ON documents(upload_time DESC) WHERE is_active = 1')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_updated ON chat_sessions(is_active, updated_at DESC)')
+            
+            # Superseded by the indexes above
+            cursor.execute('DROP INDEX IF EXISTS idx_chat_session')
+            cursor.execute('DROP INDEX IF EXISTS idx_documents_active')
+            cursor.execute('DROP INDEX IF EXISTS idx_documents_active_time')
             
             conn.commit()
             
     def add_chat_message(self, role: str, message: str, session_id: str = "default") -> int:
-        """Add a chat message to the database and ensure session exists"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Ensure session exists
-            cursor.execute('SELECT session_id FROM chat_sessions WHERE session_id = ?', (session_id,))
-            if not cursor.fetchone():
-                self.create_chat_session(session_id)
-            
-            # Add message
-            cursor.execute('''
-                INSERT INTO chat_history (session_id, role, message, timestamp)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, role, message, datetime.now().isoformat()))
-            
-            # Update session timestamp
-            cursor.execute('''
-                UPDATE chat_sessions 
-                SET updated_at = ? 
-                WHERE session_id = ?
-            ''', (datetime.now().isoformat(), session_id))
+        """Queue a chat message for writing
+        
+        Rows are inserted later by flush(), so no row id exists yet: the return
+        value is the number of messages still waiting to be written.
+        """
+        with self._lock:
+            self._pending_messages.append((session_id, role, message, datetime.now().isoformat()))
+            pending = len(self._pending_messages)
+            
+            if pending >= CHAT_FLUSH_THRESHOLD:
+                self.flush()
+                return 0
+                
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(CHAT_FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return pending
+            
+    def flush(self) -> None:
+        """Write queued chat messages in a single transaction and ensure their sessions exist"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_messages:
+                return
+                
+            pending, self._pending_messages = self._pending_messages, []
             
-            conn.commit()
-            return cursor.lastrowid
+            with self._conn as conn:
+                cursor = conn.cursor()
+                
+                # Ensure sessions exist; existing ones are left untouched
+                title = f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                cursor.executemany(SQL_ENSURE_SESSION, [(session_id, title, timestamp) for session_id, _, _, timestamp in pending])
+                
+                # Add messages
+                cursor.executemany(SQL_INSERT_MESSAGE, pending)
+                
+                # Update session timestamps to their latest message and bump message counts
+                latest = {}
+                counts = {}
+                for session_id, _, _, timestamp in pending:
+                    latest[session_id] = timestamp
+                    counts[session_id] = counts.get(session_id, 0) + 1
+                cursor.executemany(SQL_TOUCH_SESSION, [(latest[session_id], counts[session_id], session_id) for session_id in latest])
+                
+                conn.commit()
             
     def get_chat_history(self, session_id: str = "default", limit: int = 100) -> List[Dict]:
         """Get chat history for a session"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT timestamp, role, message FROM chat_history
-                WHERE session_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (session_id, limit))
+            cursor.execute(SQL_GET_HISTORY, (session_id, limit))
             
-            results = cursor.fetchall()
-            return [
-                {"timestamp": row[0], "role": row[1], "message": row[2]}
-                for row in reversed(results)  # Reverse to get chronological order
-            ]
+            return [dict(row) for row in cursor]
             
     def clear_chat_history(self, session_id: str = "default") -> int:
         """Clear chat history for a session"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('DELETE FROM chat_history WHERE session_id = ?', (session_id,))
+            deleted = cursor.rowcount
+            cursor.execute('UPDATE chat_sessions SET message_count = 0 WHERE session_id = ?', (session_id,))
             conn.commit()
-            return cursor.rowcount
+            return deleted
             
     # Chat Session Management
     def create_chat_session(self, session_id: str, title: str = None) -> str:
         """Create a new chat session"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             if not title:
                 title = f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}"
                 
-            cursor.execute('''
-                INSERT OR REPLACE INTO chat_sessions (session_id, title, updated_at)
-                VALUES (?, ?, ?)
-            ''', (session_id, title, datetime.now().isoformat()))
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO chat_sessions (session_id, title, updated_at, message_count)
+                VALUES (?, ?, {SQL_NOW_ISO}, (SELECT COUNT(*) FROM chat_history WHERE session_id = ?))
+            ''', (session_id, title, session_id))
             
             conn.commit()
             return session_id
             
     def update_chat_session(self, session_id: str, title: str = None, summary: str = None):
         """Update chat session metadata"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             updates = []
@@ -175,8 +326,7 @@ class OANADatabase:
                 updates.append("summary = ?")
                 params.append(summary)
                 
-            updates.append("updated_at = ?")
-            params.append(datetime.now().isoformat())
+            updates.append(f"updated_at = {SQL_NOW_ISO}")
             params.append(session_id)
             
             cursor.execute(f'''
@@ -189,34 +339,18 @@ class OANADatabase:
             
     def get_chat_sessions(self, limit: int = 50) -> List[Dict]:
         """Get all chat sessions ordered by most recent"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT session_id, title, summary, created_at, updated_at,
-                       (SELECT COUNT(*) FROM chat_history WHERE session_id = cs.session_id) as message_count
-                FROM chat_sessions cs
-                WHERE is_active = 1
-                ORDER BY updated_at DESC
-                LIMIT ?
-            ''', (limit,))
+            cursor.execute(SQL_GET_CHAT_SESSIONS, (limit,))
             
-            results = cursor.fetchall()
-            return [
-                {
-                    "session_id": row[0],
-                    "title": row[1],
-                    "summary": row[2],
-                    "created_at": row[3],
-                    "updated_at": row[4],
-                    "message_count": row[5]
-                }
-                for row in results
-            ]
+            return [dict(row) for row in cursor]
             
     def delete_chat_session(self, session_id: str):
         """Delete a chat session and its messages"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             # Delete chat history first
@@ -246,54 +380,69 @@ class OANADatabase:
             
     def add_document(self, name: str, path: str, content: str, file_type: str, file_size: int) -> int:
         """Add a document to the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            upload_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            cursor.execute('''
+            cursor.execute(f'''
                 INSERT INTO documents (name, path, content, file_type, file_size, upload_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (name, path, content, file_type, file_size, upload_time))
+                VALUES (?, ?, '', ?, ?, {SQL_NOW_SECONDS})
+            ''', (name, path, file_type, file_size))
+            document_id = cursor.lastrowid
+            
+            cursor.execute('''
+                INSERT INTO document_contents (doc_id, content)
+                VALUES (?, ?)
+            ''', (document_id, _compress_text(content)))
             
             conn.commit()
-            return cursor.lastrowid
+            return document_id
             
-    def get_documents(self, active_only: bool = True) -> List[Dict]:
-        """Get all documents from the database"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_documents(self, active_only: bool = True, include_content: bool = True) -> List[Dict]:
+        """Get all documents from the database; without content, only metadata is read"""
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            query = '''
-                SELECT id, name, path, content, file_type, file_size, upload_time
-                FROM documents
-            '''
-            params = []
+            if include_content:
+                query = '''
+                    SELECT d.id, d.name, d.path, d.file_type AS type, d.file_size AS size,
+                           d.upload_time, c.content
+                    FROM documents d
+                    LEFT JOIN document_contents c ON c.doc_id = d.id
+                '''
+            else:
+                query = '''
+                    SELECT d.id, d.name, d.path, d.file_type AS type, d.file_size AS size,
+                           d.upload_time
+                    FROM documents d
+                '''
             
             if active_only:
-                query += ' WHERE is_active = ?'
-                params.append(1)
+                query += ' WHERE d.is_active = 1'
                 
-            query += ' ORDER BY upload_time DESC'
+            query += ' ORDER BY d.upload_time DESC'
             
-            cursor.execute(query, params)
-            results = cursor.fetchall()
+            cursor.execute(query)
             
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "path": row[2],
-                    "content": row[3],
-                    "type": row[4],
-                    "size": row[5],
-                    "upload_time": row[6]
-                }
-                for row in results
-            ]
+            documents = []
+            for row in cursor:
+                document = dict(row)
+                if include_content:
+                    document["content"] = _decompress_text(document["content"])
+                documents.append(document)
+            return documents
+            
+    def get_document_content(self, document_id: int) -> Optional[str]:
+        """Get the extracted text of a single document"""
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT content FROM document_contents WHERE doc_id = ?', (document_id,))
+            result = cursor.fetchone()
+            return _decompress_text(result[0]) if result else None
             
     def remove_document(self, document_id: int) -> bool:
         """Remove a document (soft delete)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -305,40 +454,38 @@ class OANADatabase:
             
     def delete_document_permanently(self, document_id: int) -> bool:
         """Permanently delete a document"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+            deleted = cursor.rowcount > 0
+            cursor.execute('DELETE FROM document_contents WHERE doc_id = ?', (document_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            return deleted
             
     def get_document_by_name(self, name: str) -> Optional[Dict]:
         """Get a document by name"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
-                SELECT id, name, path, content, file_type, file_size, upload_time
-                FROM documents
-                WHERE name = ? AND is_active = 1
+                SELECT d.id, d.name, d.path, c.content, d.file_type AS type,
+                       d.file_size AS size, d.upload_time
+                FROM documents d
+                LEFT JOIN document_contents c ON c.doc_id = d.id
+                WHERE d.name = ? AND d.is_active = 1
             ''', (name,))
             
             result = cursor.fetchone()
             if result:
-                return {
-                    "id": result[0],
-                    "name": result[1],
-                    "path": result[2],
-                    "content": result[3],
-                    "type": result[4],
-                    "size": result[5],
-                    "upload_time": result[6]
-                }
+                document = dict(result)
+                document["content"] = _decompress_text(document["content"])
+                return document
             return None
             
     def save_setting(self, key: str, value: str) -> None:
         """Save a setting to the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -350,7 +497,7 @@ class OANADatabase:
             
     def get_setting(self, key: str, default_value: str = None) -> Optional[str]:
         """Get a setting from the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
@@ -360,7 +507,7 @@ class OANADatabase:
             
     def get_all_settings(self) -> Dict[str, str]:
         """Get all settings from the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT key, value FROM settings')
@@ -370,7 +517,7 @@ class OANADatabase:
             
     def create_session(self, session_id: str, title: str = None) -> int:
         """Create a new chat session"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -383,7 +530,7 @@ class OANADatabase:
             
     def get_sessions(self) -> List[Dict]:
         """Get all chat sessions"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -392,20 +539,11 @@ class OANADatabase:
                 ORDER BY last_accessed DESC
             ''')
             
-            results = cursor.fetchall()
-            return [
-                {
-                    "session_id": row[0],
-                    "title": row[1],
-                    "created_at": row[2],
-                    "last_accessed": row[3]
-                }
-                for row in results
-            ]
+            return [dict(row) for row in cursor]
             
     def update_session_access(self, session_id: str) -> None:
         """Update last accessed time for a session"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -418,7 +556,8 @@ class OANADatabase:
             
     def get_stats(self) -> Dict:
         """Get database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             # Get message count
@@ -447,40 +586,45 @@ class OANADatabase:
     def backup_to_json(self, backup_path: str) -> bool:
         """Backup database to JSON file"""
         try:
+            self.flush()
+            
+            # Read every table inside one transaction so the backup is a single
+            # consistent snapshot, even if another process writes meanwhile
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute('BEGIN')
+                try:
+                    cursor.execute('SELECT key, value FROM settings')
+                    settings = {row[0]: row[1] for row in cursor.fetchall()}
+                    
+                    cursor.execute('''
+                        SELECT session_id, title, created_at, last_accessed
+                        FROM sessions
+                        ORDER BY last_accessed DESC
+                    ''')
+                    sessions = [dict(row) for row in cursor]
+                    
+                    # Get all chat history
+                    cursor.execute('SELECT timestamp, role, message, session_id FROM chat_history ORDER BY timestamp')
+                    chat_history = [dict(row) for row in cursor]
+                    
+                    # Get all documents (excluding content for size reasons)
+                    cursor.execute('''
+                        SELECT name, path, file_type, file_size, upload_time 
+                        FROM documents WHERE is_active = 1
+                    ''')
+                    documents = [dict(row) for row in cursor]
+                finally:
+                    self._conn.commit()
+            
             backup_data = {
-                "chat_history": [],
-                "documents": [],
-                "settings": self.get_all_settings(),
-                "sessions": self.get_sessions(),
+                "chat_history": chat_history,
+                "documents": documents,
+                "settings": settings,
+                "sessions": sessions,
                 "backup_timestamp": datetime.now().isoformat()
             }
             
-            # Get all chat history
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT timestamp, role, message, session_id FROM chat_history ORDER BY timestamp')
-                for row in cursor.fetchall():
-                    backup_data["chat_history"].append({
-                        "timestamp": row[0],
-                        "role": row[1],
-                        "message": row[2],
-                        "session_id": row[3]
-                    })
-                    
-                # Get all documents (excluding content for size reasons)
-                cursor.execute('''
-                    SELECT name, path, file_type, file_size, upload_time 
-                    FROM documents WHERE is_active = 1
-                ''')
-                for row in cursor.fetchall():
-                    backup_data["documents"].append({
-                        "name": row[0],
-                        "path": row[1],
-                        "file_type": row[2],
-                        "file_size": row[3],
-                        "upload_time": row[4]
-                    })
-            
             with open(backup_path, 'w', encoding='utf-8') as f:
                 json.dump(backup_data, f, indent=2, ensure_ascii=False)
                 
@@ -490,6 +634,19 @@ class OANADatabase:
             print(f"Backup failed: {e}")
             return False
             
+    def maintenance(self):
+        """Refresh planner statistics and truncate the WAL file"""
+        with self._lock:
+            self.flush()
+            self._conn.execute('ANALYZE')
+            # Checkpoint everything and shrink the -wal file back to zero bytes
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            
     def close(self):
-        """Close database connection (not needed with context manager, but good practice)"""
-        pass
\ No newline at end of file
+        """Write queued messages and close the database connection"""
+        with self._lock:
+            self.flush()
+            atexit.unregister(self.flush)
+            # Cheap when nothing changed; re-analyzes only tables whose stats went stale
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
\ No newline at end of file
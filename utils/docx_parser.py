@@ -3,16 +3,36 @@ DOCX Parser utility for extracting text from Word documents
 """
 
 import os
+import functools
 try:
     from docx import Document
     PYTHON_DOCX_AVAILABLE = True
 except ImportError:
     PYTHON_DOCX_AVAILABLE = False
-    print("python-docx not available. DOCX parsing will be limited.")
+
+# Number of recently parsed files whose text is kept in memory
+PARSE_CACHE_SIZE = 8
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _load_docx(filepath, mtime_ns, size):
+    """Parse one version of a DOCX file; text, metadata and paragraph count share it"""
+    return Document(filepath)
+
+
+def _open_docx(filepath):
+    """Return the parsed document for the file's current version"""
+    stat = os.stat(filepath)
+    return _load_docx(os.path.realpath(filepath), stat.st_mtime_ns, stat.st_size)
+
 
 class DocxParser:
     def __init__(self):
         self.available = PYTHON_DOCX_AVAILABLE
+        if not self.available:
+            print("python-docx not available. DOCX parsing will be limited.")
+        # Re-opening an unchanged file (preview, summarize, re-upload) reuses its text
+        self._extract_cached = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(self._extract_file)
         
     def is_available(self):
         """Check if DOCX parsing is available"""
@@ -23,39 +43,48 @@ class DocxParser:
         if not self.available:
             raise Exception("python-docx not installed. Install with: pip install python-docx")
             
-        if not os.path.exists(filepath):
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
             raise FileNotFoundError(f"DOCX file not found: {filepath}")
             
+        return self._extract_cached(os.path.realpath(filepath), stat.st_mtime_ns, stat.st_size)
+        
+    def _extract_file(self, filepath, mtime_ns, size):
+        """Extract and clean the text of one version of a Word document"""
         try:
             # Handle both .docx and .doc files
             if filepath.lower().endswith('.doc') and not filepath.lower().endswith('.docx'):
                 return self._extract_from_doc(filepath)
             else:
-                return self._extract_from_docx(filepath)
+                return self._extract_from_docx(_load_docx(filepath, mtime_ns, size))
                 
         except Exception as e:
             raise Exception(f"Failed to extract text from document: {str(e)}")
             
-    def _extract_from_docx(self, filepath):
-        """Extract text from DOCX file"""
-        doc = Document(filepath)
-        text_content = ""
+    def _extract_from_docx(self, doc):
+        """Extract text from a parsed DOCX document"""
+        parts = []
         
         # Extract text from paragraphs
         for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_content += paragraph.text + "\n"
+            text = paragraph.text
+            if text.strip():
+                parts.append(text)
+                parts.append("\n")
                 
         # Extract text from tables
         for table in doc.tables:
             for row in table.rows:
                 for cell in row.cells:
-                    if cell.text.strip():
-                        text_content += cell.text + " "
-                text_content += "\n"
+                    text = cell.text
+                    if text.strip():
+                        parts.append(text)
+                        parts.append(" ")
+                parts.append("\n")
                 
         # Clean up text
-        text_content = self._clean_text(text_content)
+        text_content = self._clean_text("".join(parts))
         
         return text_content
         
@@ -70,16 +99,20 @@ class DocxParser:
             # Fallback: try to read as text (may not work well)
             try:
                 with open(filepath, 'rb') as file:
-                    raw_text = file.read().decode('utf-8', errors='ignore')
-                    # Basic cleanup for binary content
-                    text_lines = []
-                    for line in raw_text.split('\n'):
-                        # Filter out lines with too many non-printable characters
-                        printable_chars = sum(1 for c in line if c.isprintable())
-                        if len(line) > 0 and printable_chars / len(line) > 0.7:
-                            text_lines.append(line.strip())
+                    raw_bytes = file.read()
                     
-                    return '\n'.join(text_lines)
+                # Basic cleanup for binary content
+                text_lines = []
+                for line in raw_bytes.split(b'\n'):
+                    # Filter out lines with too many non-printable characters;
+                    # bytes that are not valid UTF-8 decode to U+FFFD and count
+                    # as non-printable too, so binary streams are rejected
+                    line = line.decode('utf-8', errors='replace')
+                    printable_chars = sum(map(str.isprintable, line)) - line.count('\ufffd')
+                    if line and printable_chars / len(line) > 0.7:
+                        text_lines.append(line.replace('\ufffd', '').strip())
+                
+                return '\n'.join(text_lines)
             except:
                 raise Exception("Cannot process .doc files. Please convert to .docx format or install docx2txt")
                 
@@ -89,7 +122,7 @@ class DocxParser:
             return {}
             
         try:
-            doc = Document(filepath)
+            doc = _open_docx(filepath)
             core_props = doc.core_properties
             
             return {
@@ -113,23 +146,9 @@ class DocxParser:
         if not text:
             return ""
             
-        # Remove excessive whitespace
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:
-                cleaned_lines.append(line)
-                
-        # Join lines with proper spacing
-        cleaned_text = '\n'.join(cleaned_lines)
-        
-        # Remove excessive newlines
-        while '\n\n\n' in cleaned_text:
-            cleaned_text = cleaned_text.replace('\n\n\n', '\n\n')
-            
-        return cleaned_text
+        # Strip every line and drop the empty ones in one pass; with no blank
+        # lines left there are no runs of newlines to collapse afterwards
+        return '\n'.join(filter(None, (line.strip() for line in text.split('\n'))))
         
     def get_paragraph_count(self, filepath):
         """Get number of paragraphs in document"""
@@ -137,7 +156,7 @@ class DocxParser:
             return 0
             
         try:
-            doc = Document(filepath)
+            doc = _open_docx(filepath)
             return len([p for p in doc.paragraphs if p.text.strip()])
         except:
             return 0
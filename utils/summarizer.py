@@ -2,12 +2,177 @@
 Summarizer utility for creating summaries from text content
 """
 
-from typing import Optional
+from typing import List, Optional
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import hashlib
+import heapq
+import itertools
 import re
+import sqlite3
+import threading
+import time
+try:
+    from sentence_splitter import split_text_into_sentences
+    SENTENCE_SPLITTER_AVAILABLE = True
+except ImportError:
+    SENTENCE_SPLITTER_AVAILABLE = False
+
+# Compiled once; every summary runs these over the whole document
+HORIZONTAL_SPACE_PATTERN = re.compile(r'[ \t\r\f\v]+')
+PAGE_MARKER_PATTERN = re.compile(r'--- Page \d+ ---')
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+# Periods that do not end a sentence: common abbreviations and decimal points
+NON_TERMINAL_PERIOD_PATTERN = re.compile(
+    r'\b(?:Dr|Mr|Mrs|Ms|Prof|St|vs|etc|e\.g|i\.e|U\.S|U\.K)\.|(?<=\d)\.(?=\d)',
+    re.IGNORECASE
+)
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+DIGIT_PATTERN = re.compile(r'\d')
+# Matched anywhere in the lowercased sentence, like the substring checks it replaces
+KEYWORD_PATTERN = re.compile(r'important|significant|key|main|primary|conclusion|result')
+
+# Words too common to say anything about a sentence's importance
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should'
+})
+
+# Lead-ins models put before the summary itself; stripped case-insensitively
+RESPONSE_PREFIXES = (
+    "Here is a summary:",
+    "Summary:",
+    "The summary is:",
+    "Here's a summary:",
+    "Here is a concise summary:",
+    "Concise summary:",
+    "Detailed summary:",
+    "Bullet-point summary:"
+)
+RESPONSE_PREFIX_PATTERN = re.compile(
+    r'^(?:(?:' + '|'.join(map(re.escape, RESPONSE_PREFIXES)) + r')\s*)+',
+    re.IGNORECASE
+)
+
+# Prompt templates by style; unknown styles get concise summaries / structured notes
+SUMMARY_PROMPTS = {
+    "concise": "Create a concise summary of the following text in {max_length} words or less:\n\n{text}\n\nConcise summary:",
+    "detailed": "Create a detailed summary of the following text in {max_length} words or less, preserving key details and context:\n\n{text}\n\nDetailed summary:",
+    "bullet_points": "Create a bullet-point summary of the following text in {max_length} words or less:\n\n{text}\n\nBullet-point summary:",
+}
+NOTE_PROMPTS = {
+    "structured": "Create structured notes with key points, important details, and main concepts from the following text:\n\n{text}\n\nStructured Notes:",
+    "outline": "Create a detailed outline with main points and subpoints from the following text:\n\n{text}\n\nOutline:",
+    "qa": "Create a Q&A format summary with important questions and answers from the following text:\n\n{text}\n\nQ&A Summary:",
+}
+
+# The same requests phrased for a batched prompt covering several documents
+SUMMARY_TASKS = {
+    "concise": "a concise summary in {max_length} words or less",
+    "detailed": "a detailed summary in {max_length} words or less, preserving key details and context",
+    "bullet_points": "a bullet-point summary in {max_length} words or less",
+}
+NOTE_TASKS = {
+    "structured": "structured notes with key points, important details, and main concepts",
+    "outline": "a detailed outline with main points and subpoints",
+    "qa": "a Q&A format summary with important questions and answers",
+}
+
+# Token budget for document text in one prompt; with the scaffolding and a
+# 512-token answer this fits the 4096-token context the backends are run with
+MAX_INPUT_TOKENS = 2048
+
+# Concise summaries of texts shorter than this go to the smaller summary model
+# (ai_settings.summary_model in config.json) when one is configured
+SMALL_SUMMARY_MAX_CHARS = 3000
+
+# Seconds to wait for the model before answering with the extractive summary;
+# a slower reply is cancelled so it does not keep the model from chat requests
+AI_SUMMARY_TIMEOUT = 120
+
+# Model outputs kept in the on-disk cache; the least recently used are dropped
+SUMMARY_CACHE_SIZE = 512
+
+# Documents per batched prompt and the reply tokens they share; with the
+# MAX_INPUT_TOKENS of document text this fits the 4096-token context
+MAX_BATCH_DOCUMENTS = 4
+MAX_BATCH_REPLY_TOKENS = 1792
+
+# A batched reply separates its answers with blank lines, so it may only stop
+# at the next transcript turn (the single-answer stop list ends at a blank line)
+BATCH_STOP_SEQUENCES = ["User:", "Human:"]
+
+# Start of each answer in a batched reply ("Document 2:", "**Document 2.**", ...)
+BATCH_HEADER_PATTERN = re.compile(r'^[\s#*]*Document\s+(\d+)[\s*]*[:.)][\s*]*', re.IGNORECASE | re.MULTILINE)
+
+class SummaryCache:
+    """Model outputs stored in SQLite, keyed by a BLAKE2b hash of the request"""
+    
+    def __init__(self, path: str, max_entries: int = SUMMARY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Hash the parts of a request into a cache key"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+        
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored output for a key, or None"""
+        with self._lock, self._conn as conn:
+            row = conn.execute('SELECT value FROM summaries WHERE key = ?', (key,)).fetchone()
+            if row:
+                conn.execute('UPDATE summaries SET last_used = ? WHERE key = ?', (time.time(), key))
+        return row[0] if row else None
+        
+    def set(self, key: str, value: str):
+        """Store an output and drop the least recently used ones beyond the limit"""
+        with self._lock, self._conn as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO summaries (key, value, last_used) VALUES (?, ?, ?)',
+                (key, value, time.time())
+            )
+            conn.execute(
+                'DELETE FROM summaries WHERE key NOT IN '
+                '(SELECT key FROM summaries ORDER BY last_used DESC LIMIT ?)',
+                (self.max_entries,)
+            )
 
 class Summarizer:
-    def __init__(self, ai_engine):
+    def __init__(self, ai_engine, cache_path: Optional[str] = None, max_input_tokens: int = MAX_INPUT_TOKENS):
         self.ai_engine = ai_engine
+        self.max_input_tokens = max_input_tokens
+        self.ai_timeout = AI_SUMMARY_TIMEOUT
+        
+        # Model hints for generate_response; None means the engine's loaded model.
+        # Only Ollama can switch models per prompt, so the smaller summary model is
+        # an Ollama tag that must be installed; llama-cpp always uses its loaded GGUF
+        ai_settings = getattr(ai_engine, 'config', {}).get('ai_settings', {})
+        self.small_model = ai_settings.get('summary_model') or None
+        self.big_model = None
+        
+        # Model calls dominate summarization time; unchanged documents reuse them
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = SummaryCache(cache_path)
+            except sqlite3.Error as e:
+                print(f"Summary cache unavailable: {e}")
         
     def summarize(self, text: str, max_length: int = 300, style: str = "concise") -> str:
         """
@@ -21,37 +186,79 @@ class Summarizer:
         if not text or not text.strip():
             return "No content to summarize."
             
-        # Clean and prepare text
-        cleaned_text = self._clean_text(text)
+        # Clean and prepare text; a short single line (chat turn, title, abstract)
+        # has no page markers or header lines to remove
+        if len(text) <= max_length and '\n' not in text and '--- Page' not in text:
+            cleaned_text = text.strip()
+        else:
+            cleaned_text = self._clean_text(text)
         
         # If AI engine is available, use it for summarization
         if self.ai_engine and self.ai_engine.is_ready():
-            return self._ai_summarize(cleaned_text, max_length, style)
+            cache_key = self._cache_key("summary", style, max_length, text)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            return self._race_ai_summary(cleaned_text, max_length, style, cache_key)
         else:
             # Fallback to extractive summary
             return self._extractive_summarize(cleaned_text, max_length)
             
-    def _ai_summarize(self, text: str, max_length: int, style: str) -> str:
+    def _race_ai_summary(self, text: str, max_length: int, style: str, cache_key: Optional[str]) -> str:
+        """Run the model in the background and fall back to the extractive summary if it is slow or fails"""
+        cancel = threading.Event()
+        future = self._start_background(self._ai_summarize, text, max_length, style, cache_key, cancel)
+        
+        # The extractive summary takes milliseconds; have it ready meanwhile
+        extractive = self._extractive_summarize(text, max_length)
+        
+        try:
+            summary = future.result(timeout=self.ai_timeout)
+        except FutureTimeoutError:
+            print(f"AI summarization took longer than {self.ai_timeout}s, using extractive summary")
+            cancel.set()
+            return extractive
+            
+        # The engine reports backend failures as text rather than raising
+        if not summary or summary.startswith("Error"):
+            return extractive
+        return summary
+        
+    @staticmethod
+    def _start_background(function, *args) -> Future:
+        """Run a function on a background thread, returning a Future for its result"""
+        future = Future()
+        
+        def run():
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+                
+        # A daemon thread, so a hung backend cannot keep the app from exiting
+        threading.Thread(target=run, daemon=True).start()
+        return future
+        
+    def _ai_summarize(self, text: str, max_length: int, style: str, cache_key: Optional[str] = None,
+                      cancel: Optional[threading.Event] = None) -> str:
         """Use AI to generate summary"""
         try:
+            # Short concise summaries do not need the full-size model
+            model = self.small_model if style == "concise" and len(text) < SMALL_SUMMARY_MAX_CHARS else self.big_model
+            
+            # Truncate text to the token budget, before it is copied into the prompt
+            text = self._truncate_input(text, self.max_input_tokens)
+            
             # Build summarization prompt based on style
-            if style == "bullet_points":
-                prompt = f"Create a bullet-point summary of the following text in {max_length} words or less:\n\n{text}\n\nBullet-point summary:"
-            elif style == "detailed":
-                prompt = f"Create a detailed summary of the following text in {max_length} words or less, preserving key details and context:\n\n{text}\n\nDetailed summary:"
-            else:  # concise
-                prompt = f"Create a concise summary of the following text in {max_length} words or less:\n\n{text}\n\nConcise summary:"
-                
-            # Truncate text if too long
-            max_input_length = 2000
-            if len(text) > max_input_length:
-                text = text[:max_input_length] + "..."
-                prompt = prompt.replace(text, text[:max_input_length] + "...")
-                
-            summary = self.ai_engine.generate_response(prompt)
+            prompt = SUMMARY_PROMPTS.get(style, SUMMARY_PROMPTS["concise"]).format(max_length=max_length, text=text)
+            
+            stream = self.ai_engine.generate_response_stream(prompt, model=model, cancel=cancel)
+            summary = self._clean_summary(self._read_stream(stream, max_length))
             
-            # Clean up the response
-            summary = self._clean_summary(summary)
+            # A cancelled reply is cut short; keep it out of the cache
+            if cancel is not None and cancel.is_set():
+                return summary
+            self._cache_put(cache_key, summary)
             
             return summary
             
@@ -59,8 +266,158 @@ class Summarizer:
             print(f"AI summarization failed: {e}")
             return self._extractive_summarize(text, max_length)
             
+    @staticmethod
+    def _read_stream(stream, max_words: Optional[int] = None) -> str:
+        """Collect a streamed reply, stopping at the first sentence end past max_words"""
+        # Models often overrun the word limit; stopping there saves waiting for
+        # the rest of the reply
+        parts = []
+        words = 0
+        try:
+            for chunk in stream:
+                parts.append(chunk)
+                words += chunk.count(' ') + chunk.count('\n')
+                if max_words is not None and words > max_words and chunk.rstrip().endswith(('.', '!', '?')):
+                    break
+        finally:
+            # Closing the generator ends generation in the backend
+            stream.close()
+        return "".join(parts)
+        
+    def summarize_batch(self, texts: List[str], max_length: int = 300, style: str = "concise") -> List[str]:
+        """
+        Summarize several texts with a single model call
+        
+        Prompt processing dominates local inference, so one request for all texts
+        is much faster than one per text. Falls back to summarize() per text when
+        the AI engine is not ready or the reply cannot be split per document.
+        """
+        task = SUMMARY_TASKS.get(style, SUMMARY_TASKS["concise"]).format(max_length=max_length)
+        return self._ai_batch(
+            texts, task, ("summary", style, max_length),
+            single=lambda text: self.summarize(text, max_length, style),
+            fallback=lambda text: self._extractive_summarize(self._clean_text(text), max_length),
+            max_words=max_length
+        )
+        
+    def _ai_batch(self, texts: List[str], task: str, cache_options: tuple, single, fallback,
+                  max_words: Optional[int] = None) -> List[str]:
+        """
+        Produce one result per text, asking the model about several texts per call
+        
+        Texts are sent in groups of up to MAX_BATCH_DOCUMENTS. A group whose reply
+        cannot be split per document is redone one text at a time with single();
+        a group that outlasts the AI timeout gets fallback() results instead.
+        """
+        if not (self.ai_engine and self.ai_engine.is_ready()) or not all(text and text.strip() for text in texts):
+            return [single(text) for text in texts]
+            
+        # Only texts without a cached result go to the model
+        keys = [self._cache_key(*cache_options, text) for text in texts]
+        results = [self._cache_get(key) for key in keys]
+        pending = [index for index, result in enumerate(results) if result is None]
+        
+        for start in range(0, len(pending), MAX_BATCH_DOCUMENTS):
+            group = pending[start:start + MAX_BATCH_DOCUMENTS]
+            if len(group) < 2:
+                answers = [single(texts[index]) for index in group]
+            else:
+                answers = self._ai_batch_group(
+                    [texts[index] for index in group], [keys[index] for index in group], task, max_words, fallback
+                )
+                if answers is None:
+                    answers = [single(texts[index]) for index in group]
+            for index, answer in zip(group, answers):
+                results[index] = answer
+        return results
+        
+    def _ai_batch_group(self, texts: List[str], keys: List[Optional[str]], task: str,
+                        max_words: Optional[int], fallback) -> Optional[List[str]]:
+        """Ask for one result per text in a single model call; None if the reply does not split"""
+        sections = []
+        for number, text in enumerate(texts, 1):
+            # The documents share the prompt's token budget
+            text = self._truncate_input(self._clean_text(text), self.max_input_tokens // len(texts))
+            sections.append(f"Document {number}:\n{text}")
+            
+        prompt = (
+            f"Create {task} for each of the following {len(texts)} documents.\n\n"
+            + "\n\n".join(sections)
+            + "\n\nAnswer for every document in order. Start each answer on a new line "
+            "with \"Document N:\" where N is the document number.\n\n"
+        )
+        
+        # Every document gets the reply length a single request would, as far as
+        # the context allows, and the word budget applies to the whole reply
+        reply_tokens = min(self.ai_engine.config.get("max_tokens", 512) * len(texts), MAX_BATCH_REPLY_TOKENS)
+        cancel = threading.Event()
+        stream = self.ai_engine.generate_response_stream(
+            prompt, max_tokens=reply_tokens, stop=BATCH_STOP_SEQUENCES, cancel=cancel
+        )
+        future = self._start_background(self._read_stream, stream, max_words * len(texts) if max_words else None)
+        try:
+            response = future.result(timeout=self.ai_timeout)
+        except FutureTimeoutError:
+            print(f"Batched AI request took longer than {self.ai_timeout}s, using fallback results")
+            cancel.set()
+            return [fallback(text) for text in texts]
+        except Exception as e:
+            print(f"Batched AI request failed: {e}")
+            return None
+            
+        # Accept the reply only if it has exactly one answer per document, in order
+        headers = list(BATCH_HEADER_PATTERN.finditer(response))
+        if [int(header.group(1)) for header in headers] != list(range(1, len(texts) + 1)):
+            print("Batched AI reply could not be split per document, processing one at a time")
+            return None
+            
+        ends = [header.start() for header in headers[1:]] + [len(response)]
+        answers = [self._clean_summary(response[header.end():end]) for header, end in zip(headers, ends)]
+        if not all(answers) or any(answer.startswith("Error") for answer in answers):
+            return None
+            
+        for key, answer in zip(keys, answers):
+            self._cache_put(key, answer)
+        return answers
+        
+    def _truncate_input(self, text: str, max_tokens: int) -> str:
+        """Cut text to a token budget using the model's tokenizer, marking the cut"""
+        truncated = self.ai_engine.truncate_to_tokens(text, max_tokens)
+        return truncated if len(truncated) == len(text) else truncated + "..."
+        
+    def _cache_key(self, kind: str, *parts) -> Optional[str]:
+        """Cache key for a request to the current model, or None without a cache"""
+        if self.cache is None:
+            return None
+        backend = getattr(self.ai_engine, 'backend', '')
+        model_name = getattr(self.ai_engine, 'model_name', '')
+        return SummaryCache.make_key(kind, backend, model_name, *parts)
+        
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a cached model output"""
+        if key is None:
+            return None
+        try:
+            return self.cache.get(key)
+        except sqlite3.Error as e:
+            print(f"Summary cache read failed: {e}")
+            return None
+            
+    def _cache_put(self, key: Optional[str], value: str):
+        """Store a model output; error replies and empty outputs are not kept"""
+        if key is None or not value or value.startswith("Error"):
+            return
+        try:
+            self.cache.set(key, value)
+        except sqlite3.Error as e:
+            print(f"Summary cache write failed: {e}")
+        
     def _extractive_summarize(self, text: str, max_length: int) -> str:
         """Generate extractive summary (fallback method)"""
+        # Text that already fits is its own summary
+        if len(text) <= max_length:
+            return text
+            
         try:
             # Split into sentences
             sentences = self._split_sentences(text)
@@ -73,22 +430,19 @@ class Summarizer:
             
             # Select top sentences
             num_sentences = min(max(3, len(sentences) // 4), 5)
-            top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:num_sentences]
+            top_sentences = heapq.nlargest(num_sentences, sentence_scores.items(), key=lambda x: x[1])
             
             # Sort selected sentences by original order
-            selected_sentences = []
-            for sentence, score in top_sentences:
-                sentence_index = sentences.index(sentence)
-                selected_sentences.append((sentence_index, sentence))
-                
-            selected_sentences.sort(key=lambda x: x[0])
+            top_sentences.sort(key=lambda x: x[0])
             
             # Create summary
-            summary = " ".join([sentence for _, sentence in selected_sentences])
+            summary = " ".join(sentences[index] for index, _ in top_sentences)
             
             # Truncate if too long
             if len(summary) > max_length:
-                summary = summary[:max_length].rsplit(' ', 1)[0] + "..."
+                # Cut at the last space within the limit, searched in place
+                cut = summary.rfind(' ', 0, max_length)
+                summary = (summary[:cut] if cut > 0 else summary[:max_length]) + "..."
                 
             return summary
             
@@ -99,47 +453,48 @@ class Summarizer:
             
     def _clean_text(self, text: str) -> str:
         """Clean input text"""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove page markers
-        text = re.sub(r'--- Page \d+ ---', '', text)
-        
-        # Remove very short lines (likely headers/footers)
-        lines = text.split('\n')
-        cleaned_lines = [line.strip() for line in lines if len(line.strip()) > 10]
+        # Remove page markers and excessive whitespace
+        text = HORIZONTAL_SPACE_PATTERN.sub(' ', PAGE_MARKER_PATTERN.sub('', text))
         
-        return '\n'.join(cleaned_lines)
+        # Strip every line and drop the empty ones; short lines (headings, list
+        # items, dates, wrapped paragraph tails) are kept
+        return '\n'.join(filter(None, map(str.strip, text.split('\n'))))
         
     def _split_sentences(self, text: str) -> list:
         """Split text into sentences"""
-        # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
-        
+        if SENTENCE_SPLITTER_AVAILABLE:
+            # Rule-based splitter that knows abbreviations, numbers and quotes
+            sentences = split_text_into_sentences(text, language='en')
+        else:
+            # Simple sentence splitting; periods inside abbreviations and numbers
+            # are masked first so they do not split the sentence
+            masked = NON_TERMINAL_PERIOD_PATTERN.sub(lambda match: match.group().replace('.', '\0'), text)
+            sentences = [sentence.replace('\0', '.') for sentence in SENTENCE_END_PATTERN.split(masked)]
+            
         # Clean and filter sentences
         clean_sentences = []
         for sentence in sentences:
-            sentence = sentence.strip()
+            # Sentences wrap across lines; rejoin them with spaces
+            sentence = sentence.replace('\n', ' ').strip()
             if len(sentence) > 20:  # Filter out very short sentences
                 clean_sentences.append(sentence)
                 
         return clean_sentences
         
     def _score_sentences(self, sentences: list) -> dict:
-        """Score sentences for importance"""
+        """Score sentences for importance, keyed by sentence index"""
         sentence_scores = {}
         
-        # Get word frequency
-        word_freq = self._get_word_frequency(sentences)
+        # Get word frequency; each sentence is tokenized once and reused here
+        word_freq, tokens_per_sentence, lowered_sentences = self._get_word_frequency(sentences)
         
-        for sentence in sentences:
-            words = sentence.lower().split()
-            score = 0
-            
-            # Score based on word frequency
-            for word in words:
-                if word in word_freq:
-                    score += word_freq[word]
+        # map() over dict.get with a default keeps the per-word loop in C
+        lookup = word_freq.get
+        zeros = itertools.repeat(0)
+        
+        for index, (sentence, lowered, words) in enumerate(zip(sentences, lowered_sentences, tokens_per_sentence)):
+            # Score based on word frequency (stop words and short words count 0)
+            score = sum(map(lookup, words, zeros))
                     
             # Bonus for sentence length (not too short, not too long)
             word_count = len(words)
@@ -149,56 +504,40 @@ class Summarizer:
                 score *= 0.8
                 
             # Bonus for sentences with numbers (often important facts)
-            if any(char.isdigit() for char in sentence):
+            if DIGIT_PATTERN.search(sentence):
                 score *= 1.1
                 
             # Bonus for sentences with keywords
-            keywords = ['important', 'significant', 'key', 'main', 'primary', 'conclusion', 'result']
-            if any(keyword in sentence.lower() for keyword in keywords):
+            if KEYWORD_PATTERN.search(lowered):
                 score *= 1.3
                 
-            sentence_scores[sentence] = score
+            sentence_scores[index] = score
             
         return sentence_scores
         
-    def _get_word_frequency(self, sentences: list) -> dict:
-        """Get word frequency for scoring"""
-        word_freq = {}
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
+    def _get_word_frequency(self, sentences: list) -> tuple:
+        """Get word frequency for scoring, plus each sentence's cleaned words and lowercase form"""
+        # Lowercase each sentence once; scoring reuses it for the keyword check
+        lowered_sentences = [sentence.lower() for sentence in sentences]
         
-        for sentence in sentences:
-            words = sentence.lower().split()
-            for word in words:
-                # Clean word
-                word = re.sub(r'[^\w]', '', word)
-                if len(word) > 2 and word not in stop_words:
-                    word_freq[word] = word_freq.get(word, 0) + 1
-                    
-        return word_freq
+        # Clean words: strip punctuation from each whole sentence in one pass, then split
+        tokens_per_sentence = [PUNCTUATION_PATTERN.sub('', sentence).split() for sentence in lowered_sentences]
+        
+        # Count every word in C, then drop stop words and short words; that loop
+        # runs once per distinct word instead of once per word
+        word_freq = Counter(itertools.chain.from_iterable(tokens_per_sentence))
+        for word in [word for word in word_freq if len(word) <= 2 or word in STOP_WORDS]:
+            del word_freq[word]
+            
+        return word_freq, tokens_per_sentence, lowered_sentences
         
     def _clean_summary(self, summary: str) -> str:
         """Clean AI-generated summary"""
-        # Remove common AI response prefixes
-        prefixes_to_remove = [
-            "Here is a summary:",
-            "Summary:",
-            "The summary is:",
-            "Here's a summary:",
-            "Here is a concise summary:",
-            "Concise summary:",
-            "Detailed summary:",
-            "Bullet-point summary:"
-        ]
-        
-        for prefix in prefixes_to_remove:
-            if summary.lower().startswith(prefix.lower()):
-                summary = summary[len(prefix):].strip()
-                
-        # Remove leading/trailing whitespace and newlines
-        summary = summary.strip()
+        # Remove common AI response prefixes and leading/trailing whitespace
+        summary = RESPONSE_PREFIX_PATTERN.sub('', summary.strip())
         
         # Remove multiple consecutive newlines
-        summary = re.sub(r'\n{3,}', '\n\n', summary)
+        summary = BLANK_LINES_PATTERN.sub('\n\n', summary)
         
         return summary
         
@@ -214,22 +553,31 @@ class Summarizer:
             return "No content to create notes from."
             
         if self.ai_engine and self.ai_engine.is_ready():
-            return self._ai_create_notes(text, note_style)
+            cache_key = self._cache_key("notes", note_style, text)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            return self._ai_create_notes(text, note_style, cache_key)
         else:
             return self._basic_create_notes(text)
             
-    def _ai_create_notes(self, text: str, note_style: str) -> str:
+    def create_notes_batch(self, texts: List[str], note_style: str = "structured") -> List[str]:
+        """Create notes for several texts with a single model call (see summarize_batch)"""
+        task = NOTE_TASKS.get(note_style, NOTE_TASKS["structured"])
+        return self._ai_batch(
+            texts, task, ("notes", note_style),
+            single=lambda text: self.create_notes(text, note_style),
+            fallback=self._basic_create_notes
+        )
+        
+    def _ai_create_notes(self, text: str, note_style: str, cache_key: Optional[str] = None) -> str:
         """Use AI to create structured notes"""
         try:
-            if note_style == "outline":
-                prompt = f"Create a detailed outline with main points and subpoints from the following text:\n\n{text}\n\nOutline:"
-            elif note_style == "qa":
-                prompt = f"Create a Q&A format summary with important questions and answers from the following text:\n\n{text}\n\nQ&A Summary:"
-            else:  # structured
-                prompt = f"Create structured notes with key points, important details, and main concepts from the following text:\n\n{text}\n\nStructured Notes:"
-                
-            notes = self.ai_engine.generate_response(prompt)
-            return self._clean_summary(notes)
+            prompt = NOTE_PROMPTS.get(note_style, NOTE_PROMPTS["structured"]).format(text=text)
+            
+            notes = self._clean_summary(self.ai_engine.generate_response(prompt))
+            self._cache_put(cache_key, notes)
+            return notes
             
         except Exception as e:
             print(f"AI note creation failed: {e}")
@@ -242,10 +590,10 @@ class Summarizer:
         sentence_scores = self._score_sentences(sentences)
         
         # Get top sentences
-        top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:8]
+        top_sentences = heapq.nlargest(8, sentence_scores.items(), key=lambda x: x[1])
         
         notes = "Key Points:\n\n"
-        for i, (sentence, _) in enumerate(top_sentences, 1):
-            notes += f"{i}. {sentence.strip()}\n\n"
+        for i, (index, _) in enumerate(top_sentences, 1):
+            notes += f"{i}. {sentences[index].strip()}\n\n"
             
         return notes